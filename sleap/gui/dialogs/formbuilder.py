@@ -27,7 +27,9 @@ what's supported in the YAML file, what exactly each field type does, or if you
 want to add a new type of supported form field.
 """
 
-from typing import Any, Dict, List, Optional, Text
+import copy
+import os
+from typing import Any, Dict, List, Optional, Text, Tuple
 
 import yaml
 from qtpy import QtCore, QtWidgets
@@ -35,6 +37,32 @@ from qtpy import QtCore, QtWidgets
 from sleap.gui.dialogs.filedialog import FileDialog
 from sleap.util import get_package_file
 
+# Use the libyaml-based loader when PyYAML was built with it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parsed form YAML files keyed by (path, modification time).
+_YAML_CACHE: Dict[Tuple[Text, float], Dict[Text, Any]] = dict()
+
+
+def load_form_yaml(yaml_file: Text) -> Dict[Text, Any]:
+    """
+    Loads the form data from a YAML file, only parsing each file once.
+
+    The parsed data is cached by file path and modification time, so editing
+    the file on disk will cause it to be parsed again.
+
+    Args:
+        yaml_file: filename of YAML file to load.
+
+    Returns:
+        Copy of the parsed data which the caller is free to modify.
+    """
+    key = (yaml_file, os.path.getmtime(yaml_file))
+    if key not in _YAML_CACHE:
+        with open(yaml_file, "r") as form_yaml:
+            _YAML_CACHE[key] = yaml.load(form_yaml, Loader=_YAML_LOADER)
+    return copy.deepcopy(_YAML_CACHE[key])
+
 
 class YamlFormWidget(QtWidgets.QGroupBox):
     """
@@ -65,8 +93,7 @@ class YamlFormWidget(QtWidgets.QGroupBox):
     ):
         super(YamlFormWidget, self).__init__(*args, **kwargs)
 
-        with open(yaml_file, "r") as form_yaml:
-            items_to_create = yaml.load(form_yaml, Loader=yaml.SafeLoader)
+        items_to_create = load_form_yaml(yaml_file)
 
         self.which_form = which_form
         self.form_layout = FormBuilderLayout(
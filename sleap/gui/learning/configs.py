@@ -5,7 +5,7 @@ import datetime
 import os
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Text
+from typing import Any, Dict, List, Optional, Text, Tuple
 
 import attr
 import h5py
@@ -16,6 +16,7 @@ from sleap import Labels, Skeleton
 from sleap import util as sleap_utils
 from sleap.gui.dialogs.filedialog import FileDialog
 from sleap.gui.dialogs.formbuilder import FieldComboWidget
+from sleap.gui.learning.scopedkeydict import ScopedKeyDict, unstructure_config
 from sleap.nn.config import TrainingJobConfig
 
 
@@ -46,6 +47,7 @@ class ConfigFileInfo:
     _skeleton: Optional[Skeleton] = None
     _tried_finding_skeleton: bool = False
     _dset_len_cache: dict = attr.ib(factory=dict)
+    _key_val_dict_cache: Optional[Tuple[TrainingJobConfig, dict]] = None
 
     @property
     def has_trained_model(self) -> bool:
@@ -82,6 +84,22 @@ class ConfigFileInfo:
     def metrics(self):
         return self._get_metrics("val")
 
+    @property
+    def key_val_dict(self) -> Dict[Text, Any]:
+        """Flat dictionary (with scoped keys) of the config, e.g., for forms."""
+        # cache since unstructuring the config is slow, but make sure that the
+        # cached data is for the current config object
+        if (
+            self._key_val_dict_cache is None
+            or self._key_val_dict_cache[0] is not self.config
+        ):
+            key_val_dict = ScopedKeyDict.from_hierarchical_dict(
+                unstructure_config(self.config)
+            ).key_val_dict
+            self._key_val_dict_cache = (self.config, key_val_dict)
+
+        return dict(self._key_val_dict_cache[1])
+
     @property
     def skeleton(self):
         # cache skeleton so we only search once
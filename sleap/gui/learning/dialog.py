@@ -1,20 +1,23 @@
 """
 Dialogs for running training and/or inference in GUI.
 """
-import cattr
 import os
 import shutil
 import atexit
 import tempfile
+from collections import defaultdict
+from functools import partial
 from pathlib import Path
 
+import numpy as np
+
 import sleap
 from sleap import Labels, Video
 from sleap.gui.dialogs.filedialog import FileDialog
 from sleap.gui.dialogs.formbuilder import YamlFormWidget
 from sleap.gui.learning import runners, scopedkeydict, configs, datagen, receptivefield
 
-from typing import Dict, List, Optional, Text, Optional, cast
+from typing import Callable, Dict, List, Optional, Text, Optional, Tuple, cast
 
 from qtpy import QtWidgets, QtCore
 
@@ -28,6 +31,49 @@ NODE_LIST_FIELDS = [
     "model.heads.multi_class_topdown.confmaps.anchor_part",
 ]
 
+# Pairs of (form name, field name) for fields which should show skeleton nodes
+NODE_LIST_FIELDS_BY_FORM = tuple(
+    (field_name.split(".", 1)[0], field_name) for field_name in NODE_LIST_FIELDS
+)
+
+# Prefixes of keys in form data which are part of the training config
+TRAINING_CONFIG_PREFIXES = ("data.", "model.", "optimization.", "outputs.")
+
+# Labels for head-specific tabs
+TAB_LABELS = {
+    "single_instance": "Single Instance Model Configuration",
+    "centroid": "Centroid Model Configuration",
+    "centered_instance": "Centered Instance Model Configuration",
+    "multi_instance": "Bottom-Up Model Configuration",
+    "multi_class_topdown": "Top-Down-Id Model Configuration",
+    "multi_class_bottomup": "Bottom-Up-Id Model Configuration",
+}
+
+# Heads (and so tabs) used by each pipeline
+PIPELINE_HEADS = {
+    "top-down": ("centroid", "centered_instance"),
+    "bottom-up": ("multi_instance",),
+    "top-down-id": ("centroid", "multi_class_topdown"),
+    "bottom-up-id": ("multi_class_bottomup",),
+    "single": ("single_instance",),
+}
+
+# Keys in frame selection dict for which we show the number of frames
+FRAME_COUNT_KEYS = frozenset(
+    ("random", "random_video", "suggestions", "user", "clip", "video", "all_videos")
+)
+
+# Map first word of "_predict_frames" option to key in frame selection dict
+PREDICT_FRAMES_KEYS = {
+    "current": "frame",
+    "random": "random",
+    "selected": "clip",
+    "suggested": "suggestions",
+    "entire": "video",
+    "all": "all_videos",
+    "user": "user",
+}
+
 
 class LearningDialog(QtWidgets.QDialog):
     """
@@ -62,8 +108,18 @@ class LearningDialog(QtWidgets.QDialog):
     ):
         super(LearningDialog, self).__init__()
 
+        labels_loader = None
         if labels is None:
-            labels = Labels.load_file(labels_filename)
+            # Load labels in the background while we search for config files
+            labels_loader = LabelsLoader(labels_filename)
+            QtCore.QThreadPool.globalInstance().start(labels_loader)
+
+        self._cfg_getter = configs.TrainingConfigsGetter.make_from_labels_filename(
+            labels_filename=labels_filename
+        )
+
+        if labels_loader is not None:
+            labels = labels_loader.wait()
 
         if skeleton is None and labels.skeletons:
             skeleton = labels.skeletons[0]
@@ -79,10 +135,8 @@ class LearningDialog(QtWidgets.QDialog):
 
         self.tabs: Dict[str, TrainingEditorWidget] = dict()
         self.shown_tab_names = []
-
-        self._cfg_getter = configs.TrainingConfigsGetter.make_from_labels_filename(
-            labels_filename=self.labels_filename
-        )
+        self._signals_connected = False
+        self._last_pipeline_tab_data: Optional[dict] = None
 
         # Layout for buttons
         buttons = QtWidgets.QDialogButtonBox()
@@ -169,15 +223,19 @@ class LearningDialog(QtWidgets.QDialog):
         if not videos_frames:
             return 0
 
-        count = 0
-        for frame_list in videos_frames.values():
-            # Check for [X, Y) range given as (X, -Y) tuple
-            if len(frame_list) == 2 and frame_list[1] < 0:
-                count += -frame_list[1] - frame_list[0]
-            elif frame_list != (0, 0):
-                count += len(frame_list)
+        frame_counts = np.fromiter(
+            (
+                # Check for [X, Y) range given as (X, -Y) tuple
+                -frame_list[1] - frame_list[0]
+                if len(frame_list) == 2 and frame_list[1] < 0
+                else (0 if frame_list == (0, 0) else len(frame_list))
+                for frame_list in videos_frames.values()
+            ),
+            dtype=np.int64,
+            count=len(videos_frames),
+        )
 
-        return count
+        return int(frame_counts.sum())
 
     @property
     def frame_selection(self) -> Dict[str, Dict[Video, List[int]]]:
@@ -194,43 +252,20 @@ class LearningDialog(QtWidgets.QDialog):
         if "_predict_frames" in self.pipeline_form_widget.fields.keys():
             prediction_options = []
 
-            total_random = 0
-            total_suggestions = 0
-            total_user = 0
-            random_video = 0
-            clip_length = 0
-            video_length = 0
-            all_videos_length = 0
-
             # Determine which options are available given _frame_selection
-            if "random" in self._frame_selection:
-                total_random = self.count_total_frames_for_selection_option(
-                    self._frame_selection["random"]
-                )
-            if "random_video" in self._frame_selection:
-                random_video = self.count_total_frames_for_selection_option(
-                    self._frame_selection["random_video"]
-                )
-            if "suggestions" in self._frame_selection:
-                total_suggestions = self.count_total_frames_for_selection_option(
-                    self._frame_selection["suggestions"]
-                )
-            if "user" in self._frame_selection:
-                total_user = self.count_total_frames_for_selection_option(
-                    self._frame_selection["user"]
-                )
-            if "clip" in self._frame_selection:
-                clip_length = self.count_total_frames_for_selection_option(
-                    self._frame_selection["clip"]
-                )
-            if "video" in self._frame_selection:
-                video_length = self.count_total_frames_for_selection_option(
-                    self._frame_selection["video"]
-                )
-            if "all_videos" in self._frame_selection:
-                all_videos_length = self.count_total_frames_for_selection_option(
-                    self._frame_selection["all_videos"]
+            frame_counts = {
+                key: self.count_total_frames_for_selection_option(
+                    self._frame_selection.get(key)
                 )
+                for key in FRAME_COUNT_KEYS
+            }
+            total_random = frame_counts["random"]
+            random_video = frame_counts["random_video"]
+            total_suggestions = frame_counts["suggestions"]
+            total_user = frame_counts["user"]
+            clip_length = frame_counts["clip"]
+            video_length = frame_counts["video"]
+            all_videos_length = frame_counts["all_videos"]
 
             # Build list of options
             # Priority for default (lowest to highest):
@@ -277,15 +312,12 @@ class LearningDialog(QtWidgets.QDialog):
         self.pipeline_form_widget.valueChanged.connect(self.on_tab_data_change)
 
         for head_name, tab in self.tabs.items():
-            tab.valueChanged.connect(lambda n=head_name: self.on_tab_data_change(n))
+            tab.valueChanged.connect(partial(self.on_tab_data_change, head_name))
 
-    def disconnect_signals(self):
-        self.pipeline_form_widget.valueChanged.disconnect()
-
-        for head_name, tab in self.tabs.items():
-            tab.valueChanged.disconnect()
+        self._signals_connected = True
 
     def make_tabs(self):
+        """Sets up head-specific tabs, each is only built when first accessed."""
         heads = (
             "single_instance",
             "centroid",
@@ -295,18 +327,40 @@ class LearningDialog(QtWidgets.QDialog):
             "multi_class_bottomup",
         )
 
+        self.tabs = LazyTabsDict(heads=heads, make_tab=self.make_tab)
+
+    def make_tab(self, head_name: Text) -> "TrainingEditorWidget":
+        """Builds the editor tab for a specific head."""
         video = self.labels.videos[0] if self.labels else None
 
-        for head_name in heads:
-            self.tabs[head_name] = TrainingEditorWidget(
-                video=video,
-                skeleton=self.skeleton,
-                head=head_name,
-                cfg_getter=self._cfg_getter,
-                require_trained=(self.mode == "inference"),
-            )
+        tab = TrainingEditorWidget(
+            video=video,
+            skeleton=self.skeleton,
+            head=head_name,
+            cfg_getter=self._cfg_getter,
+            require_trained=(self.mode == "inference"),
+        )
+
+        # Seed the tab with the current pipeline form data since it wasn't around
+        # for any updates made before it was built.
+        tab_data = self.get_tab_data_from_pipeline(
+            self.pipeline_form_widget.get_form_data()
+        )
+        if tab_data:
+            tab.set_fields_from_key_val_dict(tab_data)
 
-    def adjust_data_to_update_other_tabs(self, source_data, updated_data=None):
+        # Tabs built after the signals were connected need to be connected too
+        if self._signals_connected:
+            tab.valueChanged.connect(partial(self.on_tab_data_change, head_name))
+
+        return tab
+
+    def adjust_data_to_update_other_tabs(self, source_data, updated_data=None) -> bool:
+        """Sets anchor part in all heads if it's set for any head.
+
+        Returns:
+            True if any data was set in `updated_data`, False otherwise.
+        """
         if updated_data is None:
             updated_data = source_data
 
@@ -336,39 +390,58 @@ class LearningDialog(QtWidgets.QDialog):
             ] = anchor_part
             updated_data["data.instance_cropping.center_on_part"] = anchor_part
 
-    def update_tabs_from_pipeline(self, source_data):
+        return set_anchor
+
+    def get_tab_data_from_pipeline(self, source_data: dict) -> dict:
+        """Returns the pipeline form data which is used by the head tabs."""
         self.adjust_data_to_update_other_tabs(source_data)
 
+        # Only training config data (not tracking, etc.) is used by the tabs
+        return {
+            key: val
+            for key, val in source_data.items()
+            if key.startswith(TRAINING_CONFIG_PREFIXES)
+        }
+
+    def update_tabs_from_pipeline(self, source_data):
+        tab_data = self.get_tab_data_from_pipeline(source_data)
+
+        # Skip if none of the data used by the tabs changed since the last update
+        if tab_data == self._last_pipeline_tab_data:
+            return
+        self._last_pipeline_tab_data = tab_data
+
         for tab in self.tabs.values():
-            tab.set_fields_from_key_val_dict(source_data)
+            tab.set_fields_from_key_val_dict(tab_data)
 
     def update_tabs_from_tab(self, source_data):
         data_to_transfer = dict()
-        self.adjust_data_to_update_other_tabs(source_data, data_to_transfer)
-
-        if data_to_transfer:
+        if self.adjust_data_to_update_other_tabs(source_data, data_to_transfer):
             for tab in self.tabs.values():
                 tab.set_fields_from_key_val_dict(data_to_transfer)
 
     def on_tab_data_change(self, tab_name=None):
-        self.disconnect_signals()
-
-        if tab_name is None:
-            # Move data from pipeline tab to other tabs
-            source_data = self.pipeline_form_widget.get_form_data()
-            self.update_tabs_from_pipeline(source_data)
-        else:
-            # Get data from head-specific tab
-            source_data = self.tabs[tab_name].get_all_form_data()
-
-            self.update_tabs_from_tab(source_data)
+        # Block signals so that updating the other tabs doesn't trigger this again
+        blockers = [QtCore.QSignalBlocker(self.pipeline_form_widget)]
+        blockers.extend(QtCore.QSignalBlocker(tab) for tab in self.tabs.values())
+        try:
+            if tab_name is None:
+                # Move data from pipeline tab to other tabs
+                source_data = self.pipeline_form_widget.get_form_data()
+                self.update_tabs_from_pipeline(source_data)
+            else:
+                # Get data from head-specific tab
+                source_data = self.tabs[tab_name].get_all_form_data()
 
-            # Update pipeline tab
-            self.pipeline_form_widget.set_form_data(source_data)
+                self.update_tabs_from_tab(source_data)
 
-        self._validate_pipeline()
+                # Update pipeline tab
+                self.pipeline_form_widget.set_form_data(source_data)
 
-        self.connect_signals()
+            self._validate_pipeline()
+        finally:
+            for blocker in blockers:
+                blocker.unblock()
 
     def get_most_recent_pipeline_trained(self) -> Text:
         recent_cfg_info = self._cfg_getter.get_first()
@@ -398,15 +471,7 @@ class LearningDialog(QtWidgets.QDialog):
                 self.pipeline_form_widget.current_pipeline = "top-down"
 
     def add_tab(self, tab_name):
-        tab_labels = {
-            "single_instance": "Single Instance Model Configuration",
-            "centroid": "Centroid Model Configuration",
-            "centered_instance": "Centered Instance Model Configuration",
-            "multi_instance": "Bottom-Up Model Configuration",
-            "multi_class_topdown": "Top-Down-Id Model Configuration",
-            "multi_class_bottomup": "Bottom-Up-Id Model Configuration",
-        }
-        self.tab_widget.addTab(self.tabs[tab_name], tab_labels[tab_name])
+        self.tab_widget.addTab(self.tabs[tab_name], TAB_LABELS[tab_name])
         self.shown_tab_names.append(tab_name)
 
     def remove_tabs(self):
@@ -417,18 +482,8 @@ class LearningDialog(QtWidgets.QDialog):
     def set_pipeline(self, pipeline: str):
         if pipeline != self.current_pipeline:
             self.remove_tabs()
-            if pipeline == "top-down":
-                self.add_tab("centroid")
-                self.add_tab("centered_instance")
-            elif pipeline == "bottom-up":
-                self.add_tab("multi_instance")
-            elif pipeline == "top-down-id":
-                self.add_tab("centroid")
-                self.add_tab("multi_class_topdown")
-            elif pipeline == "bottom-up-id":
-                self.add_tab("multi_class_bottomup")
-            elif pipeline == "single":
-                self.add_tab("single_instance")
+            for head_name in PIPELINE_HEADS.get(pipeline, ()):
+                self.add_tab(head_name)
         self.current_pipeline = pipeline
 
         self._validate_pipeline()
@@ -436,15 +491,28 @@ class LearningDialog(QtWidgets.QDialog):
     def change_tab(self, tab_idx: int):
         print(tab_idx)
 
-    def merge_pipeline_and_head_config_data(self, head_name, head_data, pipeline_data):
+    @staticmethod
+    def split_pipeline_data_by_head(
+        pipeline_data: dict,
+    ) -> Tuple[dict, Dict[Text, dict]]:
+        """Splits pipeline form data into data shared by all heads and head data.
+
+        Args:
+            pipeline_data: Flat dictionary from the pipeline form.
+
+        Returns:
+            Tuple with dictionary of data for all heads, and dictionary which maps
+            head name to data (i.e., "model.heads.<head name>.*" keys) for that head.
+        """
+        shared_data = dict()
+        head_data = defaultdict(dict)
         for key, val in pipeline_data.items():
-            # if key.starts_with("_"):
-            #     continue
             if key.startswith("model.heads."):
-                key_scope = key.split(".")
-                if key_scope[2] != head_name:
-                    continue
-            head_data[key] = val
+                head_name = key.split(".", 3)[2]
+                head_data[head_name][key] = val
+            else:
+                shared_data[key] = val
+        return shared_data, head_data
 
     @staticmethod
     def update_loaded_config(
@@ -463,7 +531,7 @@ class LearningDialog(QtWidgets.QDialog):
             ones from the `tab_cfg_key_val_dict`.
         """
         # Serialize training config
-        loaded_cfg_hierarchical: dict = cattr.unstructure(loaded_cfg)
+        loaded_cfg_hierarchical: dict = scopedkeydict.unstructure_config(loaded_cfg)
 
         # Clear backbone subfields since these will be set by the GUI
         if (
@@ -491,6 +559,10 @@ class LearningDialog(QtWidgets.QDialog):
         # Copy relevant data into linked fields (i.e., anchor part).
         self.adjust_data_to_update_other_tabs(pipeline_form_data)
 
+        shared_data, pipeline_head_data = self.split_pipeline_data_by_head(
+            pipeline_form_data
+        )
+
         for tab_name in self.shown_tab_names:
             trained_cfg_info = self.tabs[tab_name].trained_config_info_to_use
             if self.tabs[tab_name].use_trained and (trained_cfg_info is not None):
@@ -499,11 +571,8 @@ class LearningDialog(QtWidgets.QDialog):
             else:
                 # Get config data from GUI
                 tab_cfg_key_val_dict = self.tabs[tab_name].get_all_form_data()
-                self.merge_pipeline_and_head_config_data(
-                    head_name=tab_name,
-                    head_data=tab_cfg_key_val_dict,
-                    pipeline_data=pipeline_form_data,
-                )
+                tab_cfg_key_val_dict.update(shared_data)
+                tab_cfg_key_val_dict.update(pipeline_head_data[tab_name])
                 scopedkeydict.apply_cfg_transforms_to_key_val_dict(tab_cfg_key_val_dict)
 
                 if trained_cfg_info is None:
@@ -557,33 +626,30 @@ class LearningDialog(QtWidgets.QDialog):
         frames_to_predict = dict()
 
         if self._frame_selection is not None:
-            predict_frames_choice = pipeline_form_data.get("_predict_frames", "")
-            if predict_frames_choice.startswith("current frame"):
-                frames_to_predict = self._frame_selection["frame"]
-            elif predict_frames_choice.startswith("random frames in current video"):
-                frames_to_predict = self._frame_selection["random_video"]
-            elif predict_frames_choice.startswith("random"):
-                frames_to_predict = self._frame_selection["random"]
-            elif predict_frames_choice.startswith("selected clip"):
-                frames_to_predict = self._frame_selection["clip"]
-            elif predict_frames_choice.startswith("suggested"):
-                frames_to_predict = self._frame_selection["suggestions"]
-            elif predict_frames_choice.startswith("entire current video"):
-                frames_to_predict = self._frame_selection["video"]
-            elif predict_frames_choice.startswith("all videos"):
-                frames_to_predict = self._frame_selection["all_videos"]
-            elif predict_frames_choice.startswith("user"):
-                frames_to_predict = self._frame_selection["user"]
+            frame_selection_key = self.get_frame_selection_key(
+                pipeline_form_data.get("_predict_frames", "")
+            )
+            if frame_selection_key is not None:
+                frames_to_predict = self._frame_selection[frame_selection_key]
 
         return frames_to_predict
 
+    @staticmethod
+    def get_frame_selection_key(predict_frames_choice: Text) -> Optional[Text]:
+        """Returns the frame selection key for the chosen "_predict_frames" option."""
+        if predict_frames_choice.startswith("random frames in current video"):
+            return "random_video"
+        return PREDICT_FRAMES_KEYS.get(predict_frames_choice.split(" ", 1)[0], None)
+
     def get_items_for_inference(self, pipeline_form_data) -> runners.ItemsForInference:
-        predict_frames_choice = pipeline_form_data.get("_predict_frames", "")
+        frame_selection_key = self.get_frame_selection_key(
+            pipeline_form_data.get("_predict_frames", "")
+        )
 
         frame_selection = self.get_selected_frames_to_predict(pipeline_form_data)
         frame_count = self.count_total_frames_for_selection_option(frame_selection)
 
-        if predict_frames_choice.startswith("user"):
+        if frame_selection_key == "user":
             items_for_inference = runners.ItemsForInference(
                 items=[
                     runners.DatasetItemForInference(
@@ -592,7 +658,7 @@ class LearningDialog(QtWidgets.QDialog):
                 ],
                 total_frame_count=frame_count,
             )
-        elif predict_frames_choice.startswith("suggested"):
+        elif frame_selection_key == "suggestions":
             items_for_inference = runners.ItemsForInference(
                 items=[
                     runners.DatasetItemForInference(
@@ -866,6 +932,89 @@ class LearningDialog(QtWidgets.QDialog):
         tmp_dir.cleanup()
 
 
+class LabelsLoaderSignals(QtCore.QObject):
+    """Signals for :py:class:`LabelsLoader` (since `QRunnable` can't have any)."""
+
+    finished = QtCore.Signal()
+
+
+class LabelsLoader(QtCore.QRunnable):
+    """
+    Loads `Labels` from file in a `QThreadPool` thread.
+
+    Args:
+        labels_filename: Path to the labels file to load.
+    """
+
+    def __init__(self, labels_filename: Text):
+        super(LabelsLoader, self).__init__()
+        self.setAutoDelete(False)
+        self.labels_filename = labels_filename
+        self.signals = LabelsLoaderSignals()
+        self.labels: Optional[Labels] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+
+    def run(self):
+        try:
+            self.labels = Labels.load_file(self.labels_filename)
+        except Exception as e:
+            self.error = e
+        self.done = True
+        self.signals.finished.emit()
+
+    def wait(self) -> Labels:
+        """Processes GUI events (with modal busy indicator) until labels are loaded."""
+        loop = QtCore.QEventLoop()
+        self.signals.finished.connect(loop.quit)
+
+        if not self.done:
+            # Block input to the rest of the application (and show the busy
+            # indicator right away) while the caller waits for the labels.
+            progress = QtWidgets.QProgressDialog()
+            progress.setWindowModality(QtCore.Qt.ApplicationModal)
+            progress.setMinimumDuration(0)
+            progress.setLabelText(f"Loading {self.labels_filename}...")
+            progress.setCancelButton(None)
+            progress.setRange(0, 0)
+            progress.show()
+            loop.exec_()
+            progress.close()
+
+        if self.error is not None:
+            raise self.error
+        return self.labels
+
+
+class LazyTabsDict(dict):
+    """
+    Dictionary of :py:class:`TrainingEditorWidget` tabs keyed by head name.
+
+    Tabs are built the first time they're accessed by key, so iterating over
+    the dictionary only gives the tabs which have been built so far.
+
+    Args:
+        heads: Names of heads for which a tab can be built.
+        make_tab: Function which builds the tab for a given head name.
+    """
+
+    def __init__(
+        self,
+        heads: Tuple[Text, ...],
+        make_tab: Callable[[Text], "TrainingEditorWidget"],
+    ):
+        super(LazyTabsDict, self).__init__()
+        self.heads = heads
+        self.make_tab = make_tab
+
+    def __missing__(self, head_name: Text) -> "TrainingEditorWidget":
+        if head_name not in self.heads:
+            raise KeyError(head_name)
+        tab = self.make_tab(head_name)
+        self[head_name] = tab
+        return tab
+
+
 class TrainingPipelineWidget(QtWidgets.QWidget):
     """
     Widget used in :py:class:`LearningDialog` for configuring pipeline.
@@ -894,6 +1043,15 @@ class TrainingPipelineWidget(QtWidgets.QWidget):
         self.pipeline_field = self.form_widget.form_layout.find_field("_pipeline")[0]
         self.pipeline_field.valueChanged.connect(self.emitPipeline)
 
+        # Map between full pipeline names shown in menu and short names
+        self._full_to_short: Dict[Text, Text] = dict()
+        self._short_to_full: Dict[Text, Text] = dict()
+        for full_option_name in self.pipeline_field.option_list:
+            short_name = self.get_short_pipeline_name(full_option_name)
+            self._full_to_short[full_option_name] = short_name
+            if short_name:
+                self._short_to_full.setdefault(short_name, full_option_name)
+
         self.form_widget.form_layout.valueChanged.connect(self.valueChanged)
 
         self.setLayout(self.form_widget.form_layout)
@@ -919,9 +1077,9 @@ class TrainingPipelineWidget(QtWidgets.QWidget):
         val = self.current_pipeline
         self.updatePipeline.emit(val)
 
-    @property
-    def current_pipeline(self):
-        pipeline_selected_label = self.pipeline_field.value()
+    @staticmethod
+    def get_short_pipeline_name(pipeline_selected_label: Text) -> Text:
+        """Returns short pipeline name (e.g., "top-down") for full menu name."""
         if "top-down" in pipeline_selected_label:
             if "id" not in pipeline_selected_label:
                 return "top-down"
@@ -936,6 +1094,10 @@ class TrainingPipelineWidget(QtWidgets.QWidget):
             return "single"
         return ""
 
+    @property
+    def current_pipeline(self):
+        return self._full_to_short.get(self.pipeline_field.value(), "")
+
     @current_pipeline.setter
     def current_pipeline(self, val):
         if val not in (
@@ -948,10 +1110,7 @@ class TrainingPipelineWidget(QtWidgets.QWidget):
             raise ValueError(f"Cannot set pipeline to {val}")
 
         # Match short name to full pipeline name shown in menu
-        for full_option_name in self.pipeline_field.option_list:
-            if val in full_option_name:
-                val = full_option_name
-                break
+        val = self._short_to_full.get(val, val)
 
         self.pipeline_field.setValue(val)
         self.emitPipeline()
@@ -997,6 +1156,12 @@ class TrainingEditorWidget(QtWidgets.QWidget):
         self._require_trained = require_trained
         self.head = head
 
+        self._last_rf_inputs = None
+        self._rf_update_timer = QtCore.QTimer(self)
+        self._rf_update_timer.setSingleShot(True)
+        self._rf_update_timer.setInterval(50)
+        self._rf_update_timer.timeout.connect(self._update_receptive_field)
+
         yaml_name = "training_editor_form"
 
         self.form_widgets: Dict[str, YamlFormWidget] = dict()
@@ -1011,8 +1176,7 @@ class TrainingEditorWidget(QtWidgets.QWidget):
         self.form_widgets["data"].valueChanged.connect(self.update_receptive_field)
 
         if hasattr(skeleton, "node_names"):
-            for field_name in NODE_LIST_FIELDS:
-                form_name = field_name.split(".")[0]
+            for form_name, field_name in NODE_LIST_FIELDS_BY_FORM:
                 self.form_widgets[form_name].set_field_options(
                     field_name,
                     skeleton.node_names,
@@ -1125,17 +1289,35 @@ class TrainingEditorWidget(QtWidgets.QWidget):
         self.update_receptive_field()
 
     def update_receptive_field(self):
-        data_form_data = self.form_widgets["data"].get_form_data()
+        """Schedules update of receptive field preview.
 
-        model_cfg = scopedkeydict.make_model_config_from_key_val_dict(
-            key_val_dict=self.form_widgets["model"].get_form_data()
+        Calls made in quick succession (e.g., while the user is typing) result
+        in a single update.
+        """
+        if self._receptive_field_widget:
+            self._rf_update_timer.start()
+
+    def _update_receptive_field(self):
+        model_form_data = self.form_widgets["model"].get_form_data()
+        rf_image_scale = (
+            self.form_widgets["data"]
+            .get_form_data()
+            .get("data.preprocessing.input_scaling", 1.0)
         )
 
-        rf_image_scale = data_form_data.get("data.preprocessing.input_scaling", 1.0)
+        # Skip if nothing relevant to the receptive field has changed
+        rf_inputs = (model_form_data, rf_image_scale)
+        if rf_inputs == self._last_rf_inputs:
+            return
+        self._last_rf_inputs = rf_inputs
 
-        if self._receptive_field_widget:
-            self._receptive_field_widget.setModelConfig(model_cfg, scale=rf_image_scale)
-            self._receptive_field_widget.repaint()
+        # Copy since this modifies the dict in place
+        model_cfg = scopedkeydict.make_model_config_from_key_val_dict(
+            key_val_dict=dict(model_form_data)
+        )
+
+        self._receptive_field_widget.setModelConfig(model_cfg, scale=rf_image_scale)
+        self._receptive_field_widget.repaint()
 
     def update_file_list(self):
         self._cfg_list_widget.update()
@@ -1150,12 +1332,7 @@ class TrainingEditorWidget(QtWidgets.QWidget):
         if cfg_info is None:
             return
 
-        cfg = cfg_info.config
-        cfg_dict = cattr.unstructure(cfg)
-        key_val_dict = scopedkeydict.ScopedKeyDict.from_hierarchical_dict(
-            cfg_dict
-        ).key_val_dict
-        self.set_fields_from_key_val_dict(key_val_dict)
+        self.set_fields_from_key_val_dict(cfg_info.key_val_dict)
 
     # def _set_user_config(self):
     #     cfg_form_data_dict = self.get_all_form_data()
@@ -1210,12 +1387,11 @@ class TrainingEditorWidget(QtWidgets.QWidget):
             self.form_widgets["model"].set_enabled(False)
 
             # Set model form to match config
-            cfg = cfg_info.config
-            cfg_dict = cattr.unstructure(cfg)
-            model_dict = {"model": cfg_dict["model"]}
-            key_val_dict = scopedkeydict.ScopedKeyDict.from_hierarchical_dict(
-                model_dict
-            ).key_val_dict
+            key_val_dict = {
+                key: val
+                for key, val in cfg_info.key_val_dict.items()
+                if key.startswith("model.")
+            }
             self.set_fields_from_key_val_dict(key_val_dict)
 
         # If user wants to use trained model, then reset entire form to match config
@@ -1235,6 +1411,22 @@ class TrainingEditorWidget(QtWidgets.QWidget):
             self.form_widgets["model"].set_field_enabled("_heads_name", False)
 
     def set_fields_from_key_val_dict(self, cfg_key_val_dict):
+        # Block signals from the forms while setting fields so that we emit a
+        # single valueChanged rather than one for every field that changes.
+        old_form_data = self.get_all_form_data()
+        blockers = [QtCore.QSignalBlocker(form) for form in self.form_widgets.values()]
+        try:
+            self._set_fields_from_key_val_dict(cfg_key_val_dict)
+        finally:
+            for blocker in blockers:
+                blocker.unblock()
+
+        # Only notify if any of the fields actually changed
+        if self.get_all_form_data() != old_form_data:
+            self.update_receptive_field()
+            self.emitValueChanged()
+
+    def _set_fields_from_key_val_dict(self, cfg_key_val_dict):
         for form in self.form_widgets.values():
             form.set_form_data(cfg_key_val_dict)
 
@@ -1244,7 +1436,7 @@ class TrainingEditorWidget(QtWidgets.QWidget):
         for key, val in cfg_key_val_dict.items():
             if key.startswith("model.backbone.") and val is not None:
                 backbone_name = key.split(".")[2]
-                self.set_fields_from_key_val_dict(dict(_backbone_name=backbone_name))
+                self._set_fields_from_key_val_dict(dict(_backbone_name=backbone_name))
                 break
 
     @property
@@ -2,13 +2,70 @@
 Conversion between flat (form data) and hierarchical (config object) dicts.
 """
 
-from typing import Any, Dict, Optional, Text, Tuple, Union
+from typing import Any, Callable, Dict, Optional, Text, Tuple, Union
 
 import attr
 import cattr
 
 from sleap.nn.config import TrainingJobConfig, ModelConfig
 
+# Types which are unstructured as themselves.
+_PRIMITIVE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Generated unstructure functions for each attrs class.
+_UNSTRUCTURERS: Dict[type, Callable[[Any], dict]] = dict()
+
+
+def _make_unstructurer(cls: type) -> Callable[[Any], dict]:
+    """Generates a function which unstructures instances of an attrs class.
+
+    The function reads each attribute of the class directly (rather than using
+    the generic `cattr` dispatch) and unstructures the values.
+    """
+    lines = ["def unstructure(obj):", "    return {"]
+    for field in attr.fields(cls):
+        lines.append(f"        {field.name!r}: unstructure_value(obj.{field.name}),")
+    lines.append("    }")
+
+    namespace = dict(unstructure_value=_unstructure_value)
+    exec("\n".join(lines), namespace)
+    return namespace["unstructure"]
+
+
+def _unstructure_value(val: Any) -> Any:
+    val_type = val.__class__
+    if val_type in _PRIMITIVE_TYPES:
+        return val
+    if attr.has(val_type):
+        return unstructure_config(val)
+    if val_type is list:
+        return [_unstructure_value(v) for v in val]
+    if val_type is tuple:
+        return tuple(_unstructure_value(v) for v in val)
+    if val_type is dict:
+        return {_unstructure_value(k): _unstructure_value(v) for k, v in val.items()}
+
+    # Fall back to cattr for anything else.
+    return cattr.unstructure(val)
+
+
+def unstructure_config(cfg: Any) -> dict:
+    """
+    Converts a config object (e.g., :py:class:`TrainingJobConfig`) to dicts.
+
+    This gives the same result as `cattr.unstructure`, but uses unstructure
+    functions generated for each attrs class in the config, which is faster.
+
+    Arguments:
+        cfg: Instance of an attrs class.
+    Returns:
+        Hierarchical dictionary with the data from the config.
+    """
+    cls = cfg.__class__
+    if cls not in _UNSTRUCTURERS:
+        _UNSTRUCTURERS[cls] = _make_unstructurer(cls)
+    return _UNSTRUCTURERS[cls](cfg)
+
 
 @attr.s(auto_attribs=True)
 class ScopedKeyDict:
@@ -61,18 +118,25 @@ class ScopedKeyDict:
         cls, hierarch_dicts: dict, scope_string: Text = ""
     ) -> dict:
         flattened_dict = dict()
-        for key, val in hierarch_dicts.items():
-            if isinstance(val, Dict):
-                # Dict so recurse adding node to scope string
-                flattened_dict.update(
-                    cls._make_flattened_dict(
-                        hierarch_dicts=val,
-                        scope_string=cls._subscope_key(scope_string, key),
-                    )
-                )
+
+        # Walk depth-first using a stack of (scope string, dict items iterator)
+        # so that keys are added in the same order as in the hierarchical dict.
+        stack = [(scope_string, iter(hierarch_dicts.items()))]
+        while stack:
+            scope_string, items = stack[-1]
+            for key, val in items:
+                scoped_key = cls._subscope_key(scope_string, key)
+                if isinstance(val, Dict):
+                    # Dict so descend, adding node to scope string
+                    stack.append((scoped_key, iter(val.items())))
+                    break
+                else:
+                    # Leafs (non-dict)
+                    flattened_dict[scoped_key] = val
             else:
-                # Leafs (non-dict)
-                flattened_dict[cls._subscope_key(scope_string, key)] = val
+                # Finished all items at this level
+                stack.pop()
+
         return flattened_dict
 
     @staticmethod
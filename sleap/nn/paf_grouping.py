@@ -24,13 +24,22 @@ References:
 """
 
 import attr
+from collections import Counter
+from functools import partial
 from typing import Dict, List, Union, Tuple, Text
 import tensorflow as tf
 import numpy as np
 import networkx as nx
-from sleap.nn.utils import tf_linear_sum_assignment
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
 from sleap.nn.config import MultiInstanceConfig
 
+try:
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+except ImportError:
+    # Only available in scipy >= 1.6.
+    min_weight_full_bipartite_matching = None
+
 
 @attr.s(auto_attribs=True, slots=True, frozen=True)
 class PeakID:
@@ -79,6 +88,44 @@ class EdgeConnection:
     score: float
 
 
+# Multiplier for the node index in packed peak keys (see `pack_peak_key()`).
+PEAK_KEY_STRIDE = 1 << 32
+
+
+def pack_peak_key(node_ind: int, peak_ind: int) -> int:
+    """Pack the indices that identify a peak into a single integer key.
+
+    Args:
+        node_ind: Index of the node type (channel) of the peak.
+        peak_ind: Index of the peak within its node type.
+
+    Returns:
+        An integer key that uniquely identifies the peak.
+
+    Notes:
+        This is used instead of `PeakID` internally in the matching pipeline since
+        integer keys are much faster to create and hash.
+
+    See also: unpack_peak_key
+    """
+    return int(node_ind) * PEAK_KEY_STRIDE + int(peak_ind)
+
+
+def unpack_peak_key(peak_key: int) -> PeakID:
+    """Unpack an integer key created by `pack_peak_key()` into a `PeakID`.
+
+    Args:
+        peak_key: Integer key that identifies a peak.
+
+    Returns:
+        The `PeakID` with the node and peak indices.
+
+    See also: pack_peak_key
+    """
+    node_ind, peak_ind = divmod(int(peak_key), PEAK_KEY_STRIDE)
+    return PeakID(node_ind=node_ind, peak_ind=peak_ind)
+
+
 def get_connection_candidates(
     peak_channel_inds_sample: tf.Tensor, skeleton_edges: tf.Tensor, n_nodes: int
 ) -> Tuple[tf.Tensor, tf.Tensor]:
@@ -103,41 +150,45 @@ def get_connection_candidates(
         of the peaks that form the source and destination of each candidate connection.
         This indexes into the input `peak_channel_inds_sample`.
     """
-    peak_inds = tf.argsort(peak_channel_inds_sample)
-    node_inds = tf.gather(peak_channel_inds_sample, peak_inds)
-
-    node_grouped_peak_inds = tf.RaggedTensor.from_value_rowids(
-        peak_inds, node_inds, nrows=n_nodes
-    )  # (n_nodes, (n_peaks_k))
-    edge_grouped_peak_inds = tf.gather(
-        node_grouped_peak_inds, skeleton_edges
-    )  # (n_edges, (n_src_peaks), (n_dst_peaks))
-
-    n_skeleton_edges = tf.shape(skeleton_edges)[0]
-    edge_inds = tf.TensorArray(
-        tf.int32,
-        size=n_skeleton_edges,
-        infer_shape=False,
-        element_shape=tf.TensorShape([None]),
-    )  # (n_skeleton_edges, (n_src * n_dst))
-    edge_peak_inds = tf.TensorArray(
-        tf.int32,
-        size=n_skeleton_edges,
-        infer_shape=False,
-        element_shape=tf.TensorShape([None, 2]),
-    )  # (n_skeleton_edges, (n_src * n_dst), 2)
-
-    for k in range(n_skeleton_edges):
-        sd = edge_grouped_peak_inds[k]
-
-        s, d = tf.meshgrid(sd[0], sd[1], indexing="ij")
-        sd = tf.reshape(tf.stack([s, d], axis=2), [-1, 2])
+    peak_channel_inds_sample = tf.cast(peak_channel_inds_sample, tf.int32)
+    skeleton_edges = tf.reshape(tf.cast(skeleton_edges, tf.int32), [-1, 2])
+
+    # Sort peaks by node and find where each node starts in the sorted peaks.
+    peak_inds = tf.argsort(peak_channel_inds_sample, stable=True)
+    n_node_peaks = tf.math.bincount(
+        peak_channel_inds_sample, minlength=n_nodes, maxlength=n_nodes, dtype=tf.int32
+    )  # (n_nodes,)
+    node_offsets = tf.math.cumsum(n_node_peaks, exclusive=True)  # (n_nodes,)
+
+    # Count the candidates (all source-destination peak pairs) for each edge.
+    src_nodes = skeleton_edges[:, 0]
+    dst_nodes = skeleton_edges[:, 1]
+    n_src_peaks = tf.gather(n_node_peaks, src_nodes)  # (n_edges,)
+    n_dst_peaks = tf.gather(n_node_peaks, dst_nodes)  # (n_edges,)
+    n_edge_candidates = n_src_peaks * n_dst_peaks  # (n_edges,)
+
+    # Generate all candidates at once instead of looping over the edges.
+    edge_inds = tf.repeat(
+        tf.range(tf.shape(skeleton_edges)[0]), n_edge_candidates
+    )  # (n_candidates,)
+    edge_candidate_inds = tf.range(tf.reduce_sum(n_edge_candidates)) - tf.gather(
+        tf.math.cumsum(n_edge_candidates, exclusive=True), edge_inds
+    )  # (n_candidates,)
 
-        edge_inds = edge_inds.write(k, tf.tile([k], [tf.shape(sd)[0]]))
-        edge_peak_inds = edge_peak_inds.write(k, sd)
+    # Candidates are ordered by source and then destination peak within each edge.
+    n_dst_peaks_k = tf.gather(n_dst_peaks, edge_inds)
+    src_inds = edge_candidate_inds // n_dst_peaks_k
+    dst_inds = edge_candidate_inds % n_dst_peaks_k
 
-    edge_inds = edge_inds.concat()
-    edge_peak_inds = edge_peak_inds.concat()
+    src_peak_inds = tf.gather(
+        peak_inds, tf.gather(node_offsets, tf.gather(src_nodes, edge_inds)) + src_inds
+    )
+    dst_peak_inds = tf.gather(
+        peak_inds, tf.gather(node_offsets, tf.gather(dst_nodes, edge_inds)) + dst_inds
+    )
+    edge_peak_inds = tf.stack(
+        [src_peak_inds, dst_peak_inds], axis=1
+    )  # (n_candidates, 2)
 
     return edge_inds, edge_peak_inds
 
@@ -185,14 +236,20 @@ def make_line_subs(
 
     See also: get_connection_candidates
     """
+    # Scale the peaks to the PAF grid before interpolating.
+    peaks_sample = tf.cast(peaks_sample, tf.float32) * (1.0 / pafs_stride)
     src_peaks = tf.gather(peaks_sample, edge_peak_inds[:, 0])
     dst_peaks = tf.gather(peaks_sample, edge_peak_inds[:, 1])
     n_candidates = tf.shape(src_peaks)[0]
 
-    XY = tf.linspace(src_peaks, dst_peaks, n_line_points, axis=2)
-    XY = tf.cast(
-        tf.round(XY / pafs_stride), tf.int32
-    )  # (n_candidates, 2, n_line_points)  # dim 1 is [x, y]
+    # Interpolate with a constant parametrization of the lines.
+    line_t = tf.constant(
+        np.linspace(0.0, 1.0, n_line_points, dtype="float32").reshape(1, 1, -1)
+    )
+    line_vecs = tf.expand_dims(dst_peaks - src_peaks, axis=2)  # (n_candidates, 2, 1)
+    XY = tf.expand_dims(src_peaks, axis=2) + line_vecs * line_t
+    XY = tf.cast(tf.round(XY), tf.int32)  # (n_candidates, 2, n_line_points)
+    # dim 1 is [x, y]
     XY = tf.gather(XY, [1, 0], axis=1)  # dim 1 is [row, col]
     # TODO: clip coords to size of pafs tensor?
 
@@ -328,6 +385,7 @@ def score_paf_lines(
     edge_peak_inds_sample: tf.Tensor,
     max_edge_length: float,
     dist_penalty_weight: float = 1.0,
+    fp16_scores: bool = False,
 ) -> tf.Tensor:
     """Compute the connectivity score for each PAF line in a sample.
 
@@ -350,6 +408,9 @@ def score_paf_lines(
         dist_penalty_weight: A coefficient to scale weight of the distance penalty as
             a scalar float. Set to values greater than 1.0 to enforce the distance
             penalty more strictly.
+        fp16_scores: If `True`, the dot products between the PAF vectors and the
+            displacement vectors are computed in half precision. The scores are still
+            averaged and penalized in single precision.
 
     Returns:
         The line scores as a `tf.Tensor` of shape `(n_candidates,)` and dtype
@@ -366,6 +427,35 @@ def score_paf_lines(
 
     See also: get_paf_lines, score_paf_lines_batch, compute_distance_penalty
     """
+    return _score_paf_lines(
+        tf.cast(paf_lines_sample, tf.float32),
+        tf.cast(peaks_sample, tf.float32),
+        tf.cast(edge_peak_inds_sample, tf.int32),
+        tf.cast(max_edge_length, tf.float32),
+        tf.cast(dist_penalty_weight, tf.float32),
+        tf.cast(fp16_scores, tf.bool),
+    )
+
+
+@tf.function(
+    input_signature=[
+        tf.TensorSpec([None, None, 2], tf.float32),
+        tf.TensorSpec([None, 2], tf.float32),
+        tf.TensorSpec([None, 2], tf.int32),
+        tf.TensorSpec([], tf.float32),
+        tf.TensorSpec([], tf.float32),
+        tf.TensorSpec([], tf.bool),
+    ]
+)
+def _score_paf_lines(
+    paf_lines_sample: tf.Tensor,
+    peaks_sample: tf.Tensor,
+    edge_peak_inds_sample: tf.Tensor,
+    max_edge_length: tf.Tensor,
+    dist_penalty_weight: tf.Tensor,
+    fp16_scores: tf.Tensor,
+) -> tf.Tensor:
+    """Implementation of `score_paf_lines()` traced once for all input shapes."""
     # Pull out points.
     src_peaks = tf.gather(
         peaks_sample, edge_peak_inds_sample[:, 0], axis=0
@@ -382,8 +472,16 @@ def score_paf_lines(
     spatial_vecs /= spatial_vec_lengths  # (n_candidates, 2)
 
     # Compute similarity scores
-    line_scores = tf.squeeze(
-        paf_lines_sample @ tf.expand_dims(spatial_vecs, axis=2), axis=-1
+    def _dot_line_vecs(dtype):
+        line_scores = tf.cast(paf_lines_sample, dtype) @ tf.cast(
+            tf.expand_dims(spatial_vecs, axis=2), dtype
+        )
+        return tf.cast(tf.squeeze(line_scores, axis=-1), tf.float32)
+
+    line_scores = tf.cond(
+        fp16_scores,
+        lambda: _dot_line_vecs(tf.float16),
+        lambda: _dot_line_vecs(tf.float32),
     )  # (n_candidates, n_line_points)
 
     # Compute distance penalties
@@ -413,6 +511,7 @@ def score_paf_lines_batch(
     max_edge_length_ratio: float,
     dist_penalty_weight: float,
     n_nodes: int,
+    fp16_scores: bool = False,
 ) -> Tuple[tf.RaggedTensor, tf.RaggedTensor, tf.RaggedTensor]:
     """Create and score PAF lines formed between connection candidates.
 
@@ -440,6 +539,8 @@ def score_paf_lines_batch(
             a scalar float. Set to values greater than 1.0 to enforce the distance
             penalty more strictly.
         n_nodes: The total number of nodes in the skeleton as a scalar integer.
+        fp16_scores: If `True`, the dot products between the PAF vectors and the
+            displacement vectors are computed in half precision.
 
     Returns:
         A tuple of `(edge_inds, edge_peak_inds, line_scores)` with the connections and
@@ -458,80 +559,84 @@ def score_paf_lines_batch(
         `tf.RaggedTensor` of shape `(n_samples, (n_candidates))` and dtype `tf.float32`.
 
     Notes:
-        This function handles the looping over samples in the batch and applies:
+        This function processes all samples in the batch at once and applies:
 
         1. `get_connection_candidates()`: Find peaks that form connections.
-        2. `get_paf_lines()`: Retrieve PAF vectors for each line.
+        2. `make_line_subs()`: Create the subscripts of the PAF vectors for each line.
         3. `score_paf_lines()`: Compute connectivity score for each candidate.
 
+        The nodes and edges of each sample are offset so that the whole batch is
+        handled as a single skeleton, without looping over the samples. The PAF
+        vectors at the lines of all samples are retrieved with a single gather
+        (equivalent to `get_paf_lines()`).
+
     See also: get_connection_candidates, get_paf_lines, score_paf_lines
     """
+    # Read the PAF shape once for the batch rather than slicing out a sample for it.
+    pafs_shape = tf.shape(pafs)
     max_edge_length = (
         max_edge_length_ratio
-        * tf.cast(tf.reduce_max(tf.shape(pafs[0])), tf.float32)
+        * tf.cast(tf.reduce_max(pafs_shape[1:]), tf.float32)
         * pafs_stride
     )
 
-    n_samples = tf.shape(pafs)[0]
-    edge_inds = tf.TensorArray(
-        size=n_samples,
-        infer_shape=False,
-        element_shape=tf.TensorShape([None]),
-        dtype=tf.int32,
-    )
-    edge_peak_inds = tf.TensorArray(
-        size=n_samples,
-        infer_shape=False,
-        element_shape=tf.TensorShape([None, 2]),
-        dtype=tf.int32,
-    )
-    line_scores = tf.TensorArray(
-        size=n_samples,
-        infer_shape=False,
-        element_shape=tf.TensorShape([None]),
-        dtype=tf.float32,
-    )
-    sample_inds = tf.TensorArray(
-        size=n_samples,
-        infer_shape=False,
-        element_shape=tf.TensorShape([None]),
-        dtype=tf.int32,
+    if isinstance(peaks, tf.Tensor):
+        peaks = tf.RaggedTensor.from_tensor(peaks)
+    if isinstance(peak_channel_inds, tf.Tensor):
+        peak_channel_inds = tf.RaggedTensor.from_tensor(peak_channel_inds)
+
+    n_samples = pafs_shape[0]
+    skeleton_edges = tf.reshape(tf.cast(skeleton_edges, tf.int32), [-1, 2])
+    n_edges = tf.shape(skeleton_edges)[0]
+    n_nodes = tf.cast(n_nodes, tf.int32)
+
+    # Treat the nodes and edges of each sample as separate nodes and edges of a single
+    # skeleton so that the candidates of all samples are generated at once.
+    flat_peaks = tf.cast(peaks.flat_values, tf.float32)
+    peak_sample_inds = tf.cast(peak_channel_inds.value_rowids(), tf.int32)
+    batch_channel_inds = peak_sample_inds * n_nodes + tf.cast(
+        peak_channel_inds.flat_values, tf.int32
+    )  # (n_peaks,)
+    batch_skeleton_edges = tf.reshape(
+        tf.expand_dims(tf.range(n_samples) * n_nodes, axis=1)
+        + tf.reshape(skeleton_edges, [1, -1]),
+        [-1, 2],
+    )  # (n_samples * n_edges, 2)
+    batch_edge_inds, batch_edge_peak_inds = get_connection_candidates(
+        batch_channel_inds, batch_skeleton_edges, n_samples * n_nodes
     )
 
-    for sample in range(n_samples):
-        pafs_sample = pafs[sample]
-        peaks_sample = peaks[sample]
-        peak_channel_inds_sample = peak_channel_inds[sample]
-
-        edge_inds_sample, edge_peak_inds_sample = get_connection_candidates(
-            peak_channel_inds_sample, skeleton_edges, n_nodes
-        )
-        paf_lines_sample = get_paf_lines(
-            pafs_sample,
-            peaks_sample,
-            edge_peak_inds_sample,
-            edge_inds_sample,
-            n_line_points,
-            pafs_stride,
-        )
-        line_scores_sample = score_paf_lines(
-            paf_lines_sample,
-            peaks_sample,
-            edge_peak_inds_sample,
-            max_edge_length,
-            dist_penalty_weight=dist_penalty_weight,
-        )
-        n_candidates = tf.shape(edge_peak_inds_sample)[0]
-
-        edge_inds = edge_inds.write(sample, edge_inds_sample)
-        edge_peak_inds = edge_peak_inds.write(sample, edge_peak_inds_sample)
-        line_scores = line_scores.write(sample, line_scores_sample)
-        sample_inds = sample_inds.write(sample, tf.repeat([sample], [n_candidates]))
+    # Recover the sample and edge of each candidate and index into its sample.
+    sample_inds = batch_edge_inds // n_edges  # (n_candidates,)
+    edge_inds = batch_edge_inds % n_edges  # (n_candidates,)
+    edge_peak_inds = batch_edge_peak_inds - tf.expand_dims(
+        tf.gather(tf.cast(peak_channel_inds.row_starts(), tf.int32), sample_inds),
+        axis=1,
+    )  # (n_candidates, 2)
 
-    edge_inds = edge_inds.concat()
-    edge_peak_inds = edge_peak_inds.concat()
-    line_scores = line_scores.concat()
-    sample_inds = sample_inds.concat()
+    # Pull out the PAF values at the lines of all samples at once and score them.
+    line_subs = make_line_subs(
+        flat_peaks, batch_edge_peak_inds, edge_inds, n_line_points, pafs_stride
+    )  # (n_candidates, n_line_points, 2, 3)
+    line_subs = tf.concat(
+        [
+            tf.broadcast_to(
+                tf.reshape(sample_inds, [-1, 1, 1, 1]),
+                tf.shape(line_subs[..., :1]),
+            ),
+            line_subs,
+        ],
+        axis=-1,
+    )  # (n_candidates, n_line_points, 2, 4)
+    paf_lines = tf.gather_nd(pafs, line_subs)
+    line_scores = score_paf_lines(
+        paf_lines,
+        flat_peaks,
+        batch_edge_peak_inds,
+        max_edge_length,
+        dist_penalty_weight=dist_penalty_weight,
+        fp16_scores=fp16_scores,
+    )
 
     edge_inds = tf.RaggedTensor.from_value_rowids(
         edge_inds, sample_inds, nrows=n_samples
@@ -561,8 +666,8 @@ def match_candidates_sample(
     Args:
         edge_inds_sample: A `tf.Tensor` of shape `(n_candidates,)` and dtype `tf.int32`
             indicating the indices of the edge that each of the candidate connections
-            belongs to for the sample. Can be generated using
-            `get_connection_candidates()`.
+            belongs to for the sample. Candidates must be sorted by edge index. Can be
+            generated using `get_connection_candidates()`.
         edge_peak_inds_sample: A `tf.Tensor` of shape `(n_candidates, 2)` and dtype
             `tf.int32` with the indices of the peaks that form the source and
             destination of each candidate connection. Can be generated using
@@ -594,79 +699,167 @@ def match_candidates_sample(
 
     Notes:
         The matching is performed using the Munkres algorithm implemented in
-        `scipy.optimize.linear_sum_assignment()` which is wrapped in
-        `tf_linear_sum_assignment()` for execution within a graph.
+        `scipy.optimize.linear_sum_assignment()`. All edges are matched within a single
+        `tf.numpy_function` for execution within a graph.
 
     See also: match_candidates_batch
     """
-    match_edge_inds = tf.TensorArray(
-        tf.int32, size=n_edges, infer_shape=False, element_shape=[None]
-    )
-    match_src_peak_inds = tf.TensorArray(
-        tf.int32, size=n_edges, infer_shape=False, element_shape=[None]
+    # Match all the edges on the host with a single call.
+    (
+        match_edge_inds,
+        match_src_peak_inds,
+        match_dst_peak_inds,
+        match_line_scores,
+    ) = tf.numpy_function(
+        func=partial(_match_candidates_sample, n_edges=n_edges),
+        inp=[edge_inds_sample, edge_peak_inds_sample, line_scores_sample],
+        Tout=[tf.int32, tf.int32, tf.int32, tf.float32],
     )
-    match_dst_peak_inds = tf.TensorArray(
-        tf.int32, size=n_edges, infer_shape=False, element_shape=[None]
+    match_edge_inds.set_shape([None])
+    match_src_peak_inds.set_shape([None])
+    match_dst_peak_inds.set_shape([None])
+    match_line_scores.set_shape([None])
+
+    return (
+        match_edge_inds,
+        match_src_peak_inds,
+        match_dst_peak_inds,
+        match_line_scores,
     )
-    match_line_scores = tf.TensorArray(
-        tf.float32, size=n_edges, infer_shape=False, element_shape=[None]
+
+
+def _solve_assignment(
+    cost_matrix: np.ndarray, max_sparse_density: float = 0.3, min_sparse_size: int = 64
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the minimum cost assignment for a cost matrix.
+
+    Args:
+        cost_matrix: Cost matrix of shape `(n_src, n_dst)`. Infeasible assignments
+            should be set to `np.inf`.
+        max_sparse_density: If the fraction of feasible entries in the cost matrix is
+            below this value, the matching is solved on a sparse graph.
+        min_sparse_size: Cost matrices with this many elements or fewer are always
+            solved with the dense solver.
+
+    Returns:
+        A tuple of `(row_inds, col_inds)` with the indices of the optimal assignments.
+        Infeasible assignments are never returned, so this may have fewer than
+        `min(n_src, n_dst)` assignments.
+
+    Notes:
+        The sparse solver (`min_weight_full_bipartite_matching`) is much faster than
+        `linear_sum_assignment` when most of the candidates are infeasible, but requires
+        scipy >= 1.6 and a feasible full matching. The dense solver is used otherwise.
+
+        If no full matching exists using only the feasible entries, the infeasible
+        entries are replaced with a penalty larger than the cost of any matching of
+        feasible entries. This finds the matching with the most feasible assignments
+        (and lowest cost among those), after which the penalized assignments are
+        dropped.
+    """
+    is_feasible = np.isfinite(cost_matrix)
+    if not is_feasible.any():
+        return np.zeros((0,), dtype="int64"), np.zeros((0,), dtype="int64")
+
+    if is_feasible.all():
+        return linear_sum_assignment(cost_matrix)
+
+    costs = cost_matrix[is_feasible]
+
+    if (
+        min_weight_full_bipartite_matching is not None
+        and cost_matrix.size > min_sparse_size
+        and is_feasible.mean() < max_sparse_density
+    ):
+        # Shift costs to be strictly positive since zero weights are not stored in
+        # the sparse graph. This doesn't change the optimal full matching.
+        graph = csr_matrix(
+            (costs - costs.min() + 1, np.nonzero(is_feasible)), shape=cost_matrix.shape
+        )
+        try:
+            return min_weight_full_bipartite_matching(graph)
+        except ValueError:
+            # No full matching exists using only the feasible entries.
+            pass
+
+    # Penalize infeasible entries by more than the cost of any feasible matching so
+    # that the solver uses as few of them as possible.
+    max_cost_range = (costs.max() - costs.min() + 1) * min(cost_matrix.shape)
+    penalized_cost_matrix = np.where(
+        is_feasible, cost_matrix, costs.max() + max_cost_range
     )
+    row_inds, col_inds = linear_sum_assignment(penalized_cost_matrix)
+
+    is_feasible_match = is_feasible[row_inds, col_inds]
+    return row_inds[is_feasible_match], col_inds[is_feasible_match]
+
+
+def _match_candidates_sample(
+    edge_inds_sample: np.ndarray,
+    edge_peak_inds_sample: np.ndarray,
+    line_scores_sample: np.ndarray,
+    n_edges: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Match candidate connections for a sample as numpy arrays.
+
+    This is the implementation of `match_candidates_sample()` which is run outside of
+    the graph (via `tf.numpy_function`) so that `linear_sum_assignment` can be called
+    directly for each edge. The candidates must be sorted by edge index, as generated
+    by `get_connection_candidates()`.
+    """
+    match_edge_inds = [np.zeros((0,), dtype="int32")]
+    match_src_peak_inds = [np.zeros((0,), dtype="int32")]
+    match_dst_peak_inds = [np.zeros((0,), dtype="int32")]
+    match_line_scores = [np.zeros((0,), dtype="float32")]
+
+    # Candidates are grouped by edge, so find the range of each edge at once.
+    edge_bounds = np.searchsorted(edge_inds_sample, np.arange(n_edges + 1))
 
     for k in range(n_edges):
-        is_edge_k = tf.squeeze(tf.where(edge_inds_sample == k), axis=1)
-        edge_peak_inds_k = tf.gather(edge_peak_inds_sample, is_edge_k, axis=0)
-        line_scores_k = tf.gather(line_scores_sample, is_edge_k, axis=0)
+        start, stop = edge_bounds[k], edge_bounds[k + 1]
+        edge_peak_inds_k = edge_peak_inds_sample[start:stop]
+        line_scores_k = line_scores_sample[start:stop]
 
-        # Get the unique peak indices
-        src_peak_inds_k, _ = tf.unique(edge_peak_inds_k[:, 0])
-        dst_peak_inds_k, _ = tf.unique(edge_peak_inds_k[:, 1])
+        # Get the number of unique peaks
+        n_src = len(np.unique(edge_peak_inds_k[:, 0]))
+        n_dst = len(np.unique(edge_peak_inds_k[:, 1]))
 
-        n_src = tf.shape(src_peak_inds_k)[0]
-        n_dst = tf.shape(dst_peak_inds_k)[0]
+        if n_src == 0 or n_dst == 0:
+            # Nothing to match.
+            continue
 
         # Reshape line scores into cost matrix (n_src, n_dst)
-        scores_matrix = tf.reshape(line_scores_k, [n_src, n_dst])
+        scores_matrix = line_scores_k.reshape(n_src, n_dst)
 
         # Replace NaNs with inf since linear_sum_assignment doesn't accept NaNs and flip
         # sign.
-        cost_matrix = tf.where(
-            condition=tf.math.is_nan(scores_matrix),
-            x=tf.constant([np.inf]),
-            y=-scores_matrix,
-        )
-
-        # Match
-        match_src_inds, match_dst_inds = tf_linear_sum_assignment(cost_matrix)
-
-        # Pull out matched scores.
-        match_subs = tf.stack([match_src_inds, match_dst_inds], axis=1)
-        match_line_scores_k = tf.gather_nd(scores_matrix, match_subs)
-
-        # Get the peak indices for the matched points (these index into peaks_sample)
-        # match_src_peak_inds_k = tf.gather(src_peak_inds_k, match_src_inds)
-        # match_dst_peak_inds_k = tf.gather(dst_peak_inds_k, match_dst_inds)
-        # These index into the edge-grouped peaks
-        match_src_peak_inds_k = match_src_inds
-        match_dst_peak_inds_k = match_dst_inds
+        cost_matrix = np.where(np.isnan(scores_matrix), np.inf, -scores_matrix)
+
+        # Match. These index into the edge-grouped peaks.
+        if n_src == 1 or n_dst == 1:
+            # With a single source or destination peak, the best match is the
+            # candidate with the lowest cost, so we can skip the full assignment.
+            best_inds = np.array([np.argmin(cost_matrix)])
+            best_inds = best_inds[np.isfinite(cost_matrix.ravel()[best_inds])]
+            match_src_inds, match_dst_inds = np.unravel_index(
+                best_inds, cost_matrix.shape
+            )
+        else:
+            match_src_inds, match_dst_inds = _solve_assignment(cost_matrix)
 
         # Save
-        match_edge_inds = match_edge_inds.write(
-            k, tf.repeat([k], [tf.shape(match_src_peak_inds_k)[0]])
+        match_edge_inds.append(np.full(len(match_src_inds), k, dtype="int32"))
+        match_src_peak_inds.append(match_src_inds.astype("int32"))
+        match_dst_peak_inds.append(match_dst_inds.astype("int32"))
+        match_line_scores.append(
+            scores_matrix[match_src_inds, match_dst_inds].astype("float32")
         )
-        match_src_peak_inds = match_src_peak_inds.write(k, match_src_peak_inds_k)
-        match_dst_peak_inds = match_dst_peak_inds.write(k, match_dst_peak_inds_k)
-        match_line_scores = match_line_scores.write(k, match_line_scores_k)
-
-    match_edge_inds = match_edge_inds.concat()
-    match_src_peak_inds = match_src_peak_inds.concat()
-    match_dst_peak_inds = match_dst_peak_inds.concat()
-    match_line_scores = match_line_scores.concat()
 
     return (
-        match_edge_inds,
-        match_src_peak_inds,
-        match_dst_peak_inds,
-        match_line_scores,
+        np.concatenate(match_edge_inds),
+        np.concatenate(match_src_peak_inds),
+        np.concatenate(match_dst_peak_inds),
+        np.concatenate(match_line_scores),
     )
 
 
@@ -716,8 +909,8 @@ def match_candidates_batch(
 
     Notes:
         The matching is performed using the Munkres algorithm implemented in
-        `scipy.optimize.linear_sum_assignment()` which is wrapped in
-        `tf_linear_sum_assignment()` for execution within a graph.
+        `scipy.optimize.linear_sum_assignment()`. All edges in a sample are matched
+        within a single `tf.numpy_function` for execution within a graph.
 
     See also: match_candidates_sample, score_paf_lines_batch, group_instances_batch
     """
@@ -830,16 +1023,51 @@ def assign_connections_to_instances(
 
         This function expects connections from a single sample/frame!
     """
-    # Grouping table that maps PeakID(node_ind, peak_ind) to an instance_id.
+    instance_assignments = _assign_connections_to_instances(
+        connections, min_instance_peaks=min_instance_peaks, n_nodes=n_nodes
+    )
+    return {
+        unpack_peak_key(peak_key): instance
+        for peak_key, instance in instance_assignments.items()
+    }
+
+
+def _assign_connections_to_instances(
+    connections: Dict[EdgeType, List[EdgeConnection]],
+    min_instance_peaks: Union[int, float] = 0,
+    n_nodes: int = None,
+) -> Dict[int, int]:
+    """Implementation of `assign_connections_to_instances()` with packed peak keys.
+
+    This returns a dict mapping the packed peak keys (see `pack_peak_key()`) to
+    instance IDs.
+    """
+    # Grouping table that maps the packed (node_ind, peak_ind) key to an instance_id.
     instance_assignments = dict()
 
+    # Peaks assigned to each instance so we can find and merge instances without
+    # scanning through all of the assignments.
+    instance_peaks: Dict[int, set] = dict()
+
+    # Number of peaks of each node in each instance, updated as peaks are assigned.
+    # These are counts since an instance may have more than one peak of a node.
+    instance_nodes: Dict[int, Counter] = dict()
+
+    # ID of the next instance to be created. IDs are never reused after merging.
+    next_instance_id = 0
+
     # Loop through edge types.
     for edge_type, edge_connections in connections.items():
+        src_node_ind, dst_node_ind = edge_type.src_node_ind, edge_type.dst_node_ind
+        src_key_offset = pack_peak_key(src_node_ind, 0)
+        dst_key_offset = pack_peak_key(dst_node_ind, 0)
+
         # Loop through connections for the current edge.
         for connection in edge_connections:
-            # Notation: specific peaks are identified by (node_ind, peak_ind).
-            src_id = PeakID(edge_type.src_node_ind, connection.src_peak_ind)
-            dst_id = PeakID(edge_type.dst_node_ind, connection.dst_peak_ind)
+            # Notation: specific peaks are identified by (node_ind, peak_ind) which are
+            # packed into a single key.
+            src_id = src_key_offset + connection.src_peak_ind
+            dst_id = dst_key_offset + connection.dst_peak_ind
 
             # Get instance assignments for the connection peaks.
             src_instance = instance_assignments.get(src_id, None)
@@ -848,39 +1076,46 @@ def assign_connections_to_instances(
             if src_instance is None and dst_instance is None:
                 # Case 1: Neither peak is assigned to an instance yet. We'll create a
                 # new instance to hold both.
-                new_instance = max(instance_assignments.values(), default=-1) + 1
-                instance_assignments[src_id] = new_instance
-                instance_assignments[dst_id] = new_instance
+                instance_assignments[src_id] = next_instance_id
+                instance_assignments[dst_id] = next_instance_id
+                instance_peaks[next_instance_id] = {src_id, dst_id}
+                instance_nodes[next_instance_id] = Counter((src_node_ind, dst_node_ind))
+                next_instance_id += 1
 
             elif src_instance is not None and dst_instance is None:
                 # Case 2: The source peak is assigned already, but not the destination
                 # peak. We'll assign the destination peak to the same instance as the
                 # source.
                 instance_assignments[dst_id] = src_instance
+                instance_peaks[src_instance].add(dst_id)
+                instance_nodes[src_instance][dst_node_ind] += 1
 
             elif src_instance is not None and dst_instance is not None:
+                if src_instance == dst_instance:
+                    # Already in the same instance.
+                    continue
+
                 # Case 3: Both peaks have been assigned. We'll update the destination
                 # peak to be a part of the source peak instance.
                 instance_assignments[dst_id] = src_instance
+                instance_peaks[dst_instance].discard(dst_id)
+                instance_peaks[src_instance].add(dst_id)
+                src_instance_nodes = instance_nodes[src_instance]
+                dst_instance_nodes = instance_nodes[dst_instance]
+                src_instance_nodes[dst_node_ind] += 1
+                dst_instance_nodes[dst_node_ind] -= 1
+                if dst_instance_nodes[dst_node_ind] == 0:
+                    del dst_instance_nodes[dst_node_ind]
 
                 # We'll also check if they form disconnected subgraphs, in which case
                 # we'll merge them by assigning all peaks belonging to the destination
                 # peak's instance to the source peak's instance.
-                src_instance_nodes = set(
-                    peak_id.node_ind
-                    for peak_id, instance in instance_assignments.items()
-                    if instance == src_instance
-                )
-                dst_instance_nodes = set(
-                    peak_id.node_ind
-                    for peak_id, instance in instance_assignments.items()
-                    if instance == dst_instance
-                )
-
-                if len(src_instance_nodes.intersection(dst_instance_nodes)) == 0:
-                    for peak_id in instance_assignments:
-                        if instance_assignments[peak_id] == dst_instance:
-                            instance_assignments[peak_id] = src_instance
+                if src_instance_nodes.keys().isdisjoint(dst_instance_nodes):
+                    dst_instance_peaks = instance_peaks.pop(dst_instance)
+                    for peak_id in dst_instance_peaks:
+                        instance_assignments[peak_id] = src_instance
+                    instance_peaks[src_instance].update(dst_instance_peaks)
+                    src_instance_nodes.update(instance_nodes.pop(dst_instance))
 
     if min_instance_peaks > 0:
         if isinstance(min_instance_peaks, float):
@@ -896,13 +1131,13 @@ def assign_connections_to_instances(
             min_instance_peaks = int(min_instance_peaks * n_nodes)
 
         # Compute instance peak counts.
-        instance_ids, instance_peak_counts = np.unique(
-            list(instance_assignments.values()), return_counts=True
+        instance_peak_counts = np.bincount(
+            np.fromiter(
+                instance_assignments.values(),
+                dtype="int64",
+                count=len(instance_assignments),
+            )
         )
-        instance_peak_counts = {
-            instance: peaks_count
-            for instance, peaks_count in zip(instance_ids, instance_peak_counts)
-        }
 
         # Filter out small instances.
         instance_assignments = {
@@ -935,6 +1170,28 @@ def make_predicted_instances(
         predicted_peak_scores: (n_instances, n_nodes) array
         predicted_instance_scores: (n_instances,) array
     """
+    return _make_predicted_instances(
+        peaks,
+        peak_scores,
+        connections,
+        {
+            pack_peak_key(peak_id.node_ind, peak_id.peak_ind): instance
+            for peak_id, instance in instance_assignments.items()
+        },
+    )
+
+
+def _make_predicted_instances(
+    peaks: np.array,
+    peak_scores: np.array,
+    connections: List[EdgeConnection],
+    instance_assignments: Dict[int, int],
+) -> Tuple[np.array, np.array, np.array]:
+    """Implementation of `make_predicted_instances()` with packed peak keys.
+
+    The keys of `instance_assignments` are the packed peak keys (see
+    `pack_peak_key()`). Note that this dict is modified in place.
+    """
     # Ensure instance IDs are contiguous.
     instance_ids, instance_inds = np.unique(
         list(instance_assignments.values()), return_inverse=True
@@ -947,12 +1204,13 @@ def make_predicted_instances(
     predicted_instance_scores = np.full((n_instances,), 0.0, dtype="float32")
 
     for edge_type, edge_connections in connections.items():
+        src_key_offset = pack_peak_key(edge_type.src_node_ind, 0)
+        dst_key_offset = pack_peak_key(edge_type.dst_node_ind, 0)
+
         # Loop over all connections for this edge type.
         for edge_connection in edge_connections:
             # Look up the source peak.
-            src_peak_id = PeakID(
-                node_ind=edge_type.src_node_ind, peak_ind=edge_connection.src_peak_ind
-            )
+            src_peak_id = src_key_offset + edge_connection.src_peak_ind
             if src_peak_id in instance_assignments:
                 # Add to the total instance score.
                 instance_ind = instance_assignments[src_peak_id]
@@ -960,23 +1218,39 @@ def make_predicted_instances(
 
                 # Sanity check: both peaks in the edge should have been assigned to the
                 # same instance.
-                dst_peak_id = PeakID(
-                    node_ind=edge_type.dst_node_ind,
-                    peak_ind=edge_connection.dst_peak_ind,
-                )
+                dst_peak_id = dst_key_offset + edge_connection.dst_peak_ind
                 assert instance_ind == instance_assignments[dst_peak_id]
 
     # Fill out instances and peak scores.
     n_nodes = len(peaks)
     predicted_instances = np.full((n_instances, n_nodes, 2), np.nan, dtype="float32")
     predicted_peak_scores = np.full((n_instances, n_nodes), np.nan, dtype="float32")
-    for peak_id, instance_ind in instance_assignments.items():
-        predicted_instances[instance_ind, peak_id.node_ind, :] = peaks[
-            peak_id.node_ind
-        ][peak_id.peak_ind]
-        predicted_peak_scores[instance_ind, peak_id.node_ind] = peak_scores[
-            peak_id.node_ind
-        ][peak_id.peak_ind]
+    if n_instances > 0:
+        # Unpack the node and peak indices of all assigned peaks.
+        peak_keys = np.fromiter(
+            instance_assignments.keys(), dtype="int64", count=len(instance_assignments)
+        )
+        node_inds, peak_inds = np.divmod(peak_keys, PEAK_KEY_STRIDE)
+
+        # If more than one peak of a node is assigned to an instance, use the last one.
+        _, last_inds = np.unique(
+            (instance_inds * n_nodes + node_inds)[::-1], return_index=True
+        )
+        last_inds = len(peak_keys) - 1 - last_inds
+        instance_inds = instance_inds[last_inds]
+        node_inds = node_inds[last_inds]
+        peak_inds = peak_inds[last_inds]
+
+        # Index into the peaks of all nodes stacked together.
+        node_offsets = np.cumsum([0] + [len(node_peaks) for node_peaks in peaks])
+        stacked_peak_inds = node_offsets[node_inds] + peak_inds
+
+        predicted_instances[instance_inds, node_inds] = np.concatenate(peaks)[
+            stacked_peak_inds
+        ]
+        predicted_peak_scores[instance_inds, node_inds] = np.concatenate(peak_scores)[
+            stacked_peak_inds
+        ]
 
     return predicted_instances, predicted_peak_scores, predicted_instance_scores
 
@@ -1049,8 +1323,9 @@ def group_instances_sample(
         shape `(n_instances,)` and dtype `float32`.
 
     Notes:
-        This function is meant to be run as a `tf.py_function` within a graph (see
-        `group_instances_batch()`).
+        This function is meant to be run as a `tf.numpy_function` within a graph (see
+        `group_instances_batch()`), in which case all inputs are already numpy arrays.
+        Eager tensors are also accepted and converted to numpy arrays.
     """
     if isinstance(peaks_sample, tf.Tensor):
         # Convert all the data to numpy arrays.
@@ -1070,33 +1345,46 @@ def group_instances_sample(
     match_dst_peak_inds_sample = match_dst_peak_inds_sample[is_valid_match]
     match_line_scores_sample = match_line_scores_sample[is_valid_match]
 
-    # Group peaks by channel.
-    peaks = []
-    peak_scores = []
-    for i in range(n_nodes):
-        in_channel = peak_channel_inds_sample == i
-        peaks.append(peaks_sample[in_channel])
-        peak_scores.append(peak_scores_sample[in_channel])
+    # Group peaks by channel with a single stable sort so that the peaks keep their
+    # order within each channel.
+    channel_order = np.argsort(peak_channel_inds_sample, kind="stable")
+    channel_bounds = np.searchsorted(
+        peak_channel_inds_sample[channel_order], np.arange(1, n_nodes)
+    )
+    peaks = np.split(peaks_sample[channel_order], channel_bounds)
+    peak_scores = np.split(peak_scores_sample[channel_order], channel_bounds)
+
+    # Sort connections by edge (keeping their order within each edge) and find the
+    # range of each edge in the sorted connections.
+    edge_order = np.argsort(match_edge_inds_sample, kind="stable")
+    edge_bounds = np.searchsorted(
+        match_edge_inds_sample[edge_order], np.arange(len(edge_types) + 1)
+    )
+    match_src_peak_inds_sample = match_src_peak_inds_sample[edge_order]
+    match_dst_peak_inds_sample = match_dst_peak_inds_sample[edge_order]
+    match_line_scores_sample = match_line_scores_sample[edge_order]
 
     # Group connection data by edge in sorted order.
     # Note: This step is crucial since the instance assembly depends on the ordering
     # of the edges.
     connections = {}
     for edge_ind in sorted_edge_inds:
-        in_edge = match_edge_inds_sample == edge_ind
+        start, stop = edge_bounds[edge_ind], edge_bounds[edge_ind + 1]
         edge_type = edge_types[edge_ind]
 
-        src_peak_inds = match_src_peak_inds_sample[in_edge]
-        dst_peak_inds = match_dst_peak_inds_sample[in_edge]
-        line_scores = match_line_scores_sample[in_edge]
+        src_peak_inds = match_src_peak_inds_sample[start:stop]
+        dst_peak_inds = match_dst_peak_inds_sample[start:stop]
+        line_scores = match_line_scores_sample[start:stop]
 
         connections[edge_type] = [
             EdgeConnection(src, dst, score)
-            for src, dst, score in zip(src_peak_inds, dst_peak_inds, line_scores)
+            for src, dst, score in zip(
+                src_peak_inds.tolist(), dst_peak_inds.tolist(), line_scores.tolist()
+            )
         ]
 
     # Bipartite graph partitioning to group connections into instances.
-    instance_assignments = assign_connections_to_instances(
+    instance_assignments = _assign_connections_to_instances(
         connections,
         min_instance_peaks=min_instance_peaks,
         n_nodes=n_nodes,
@@ -1107,7 +1395,7 @@ def group_instances_sample(
         predicted_instances,
         predicted_peak_scores,
         predicted_instance_scores,
-    ) = make_predicted_instances(peaks, peak_scores, connections, instance_assignments)
+    ) = _make_predicted_instances(peaks, peak_scores, connections, instance_assignments)
 
     return predicted_instances, predicted_peak_scores, predicted_instance_scores
 
@@ -1194,11 +1482,8 @@ def group_instances_batch(
         match_src_peak_inds_sample,
         match_dst_peak_inds_sample,
         match_line_scores_sample,
-        n_nodes,
-        sorted_edge_inds,
-        min_instance_peaks,
     ):
-        """Helper to avoid passing `EdgeType`s to `tf.py_function`."""
+        """Helper to avoid passing `EdgeType`s to `tf.numpy_function`."""
         return group_instances_sample(
             peaks_sample,
             peak_scores_sample,
@@ -1236,12 +1521,12 @@ def group_instances_batch(
     )
 
     for sample in range(n_samples):
-        # Call sample-wise function in Eager mode.
+        # Call sample-wise function on numpy arrays.
         (
             predicted_instances_sample,
             predicted_peak_scores_sample,
             predicted_instance_scores_sample,
-        ) = tf.py_function(
+        ) = tf.numpy_function(
             _group_instances_sample,
             inp=[
                 peaks[sample],
@@ -1251,13 +1536,12 @@ def group_instances_batch(
                 match_src_peak_inds[sample],
                 match_dst_peak_inds[sample],
                 match_line_scores[sample],
-                n_nodes,
-                sorted_edge_inds,
-                # edge_types, # not serializable!
-                min_instance_peaks,
             ],
             Tout=[tf.float32, tf.float32, tf.float32],
         )
+        predicted_instances_sample.set_shape([None, n_nodes, 2])
+        predicted_peak_scores_sample.set_shape([None, n_nodes])
+        predicted_instance_scores_sample.set_shape([None])
 
         sample_inds = sample_inds.write(
             sample, tf.repeat([sample], [tf.shape(predicted_instances_sample)[0]])
@@ -1290,6 +1574,192 @@ def group_instances_batch(
     return predicted_instances, predicted_peak_scores, predicted_instance_scores
 
 
+def match_and_group_instances_batch(
+    peaks: tf.RaggedTensor,
+    peak_vals: tf.RaggedTensor,
+    peak_channel_inds: tf.RaggedTensor,
+    edge_inds: tf.RaggedTensor,
+    edge_peak_inds: tf.RaggedTensor,
+    line_scores: tf.RaggedTensor,
+    n_edges: int,
+    n_nodes: int,
+    sorted_edge_inds: Tuple[int],
+    edge_types: List[EdgeType],
+    min_instance_peaks: int,
+    min_line_scores: float = 0.25,
+) -> Tuple[tf.RaggedTensor, tf.RaggedTensor, tf.RaggedTensor]:
+    """Match candidate connections and group them into full instances for a batch.
+
+    Args:
+        peaks: The sample-grouped detected peaks in a batch as a `tf.RaggedTensor` of
+            shape `(n_samples, (n_peaks), 2)` and dtype `tf.float32`. These should be
+            `(x, y)` coordinates of each peak in the image scale.
+        peak_vals: The sample-grouped scores of the detected peaks in a batch as a
+            `tf.RaggedTensor` of shape `(n_samples, (n_peaks))` and dtype `tf.float32`.
+        peak_channel_inds: The sample-grouped indices of the channel (node) that each
+            detected peak is associated with as a `tf.RaggedTensor` of shape
+            `(n_samples, (n_peaks))` and dtype `tf.int32`.
+        edge_inds: Sample-grouped edge indices as a `tf.RaggedTensor` of shape
+            `(n_samples, (n_candidates))` and dtype `tf.int32` indicating the indices
+            of the edge that each of the candidate connections belongs to. Can be
+            generated using `score_paf_lines_batch()`.
+        edge_peak_inds: Sample-grouped indices of the peaks that form the source and
+            destination of each candidate connection as a `tf.RaggedTensor` of shape
+            `(n_samples, (n_candidates), 2)` and dtype `tf.int32`. Can be generated
+            using `score_paf_lines_batch()`.
+        line_scores: Sample-grouped scores for each candidate connection as a
+            `tf.RaggedTensor` of shape `(n_samples, (n_candidates))` and dtype
+            `tf.float32`. Can be generated using `score_paf_lines_batch()`.
+        n_edges: A scalar `int` denoting the number of edges in the skeleton.
+        n_nodes: The total number of nodes in the skeleton as a scalar integer.
+        sorted_edge_inds: A tuple of indices specifying the topological order that the
+            edge types should be accessed in during instance assembly
+            (`assign_connections_to_instances`).
+        edge_types: A list of `EdgeType`s associated with the skeleton.
+        min_instance_peaks: If this is greater than 0, grouped instances with fewer
+            assigned peaks than this threshold will be excluded. If a `float` in the
+            range `(0., 1.]` is provided, this is interpreted as a fraction of the total
+            number of nodes in the skeleton. If an `int` is provided, this is the
+            absolute minimum number of peaks.
+        min_line_scores: Minimum line score (between -1 and 1) required to form a match
+            between candidate point pairs.
+
+    Returns:
+        A tuple of arrays with the grouped instances for the whole batch grouped by
+        sample:
+
+        `predicted_instances`: The sample- and instance-grouped coordinates for each
+        instance as `tf.RaggedTensor` of shape `(n_samples, (n_instances), n_nodes, 2)`
+        and dtype `tf.float32`. Missing peaks are represented by `NaN`s.
+
+        `predicted_peak_scores`: The sample- and instance-grouped confidence map values
+        for each peak as an array of `(n_samples, (n_instances), n_nodes)` and dtype
+        `tf.float32`.
+
+        `predicted_instance_scores`: The sample-grouped instance grouping score for each
+        instance as an array of shape `(n_samples, (n_instances))` and dtype
+        `tf.float32`.
+
+    Notes:
+        This gives the same results as `match_candidates_batch()` followed by
+        `group_instances_batch()`, but both steps are run on the host within a single
+        `tf.numpy_function` for the whole batch. The matched connections are passed
+        directly to the grouping as numpy arrays rather than as tensors.
+
+    See also: match_candidates_batch, group_instances_batch
+    """
+
+    def _match_and_group_instances_sample(
+        peaks_sample,
+        peak_scores_sample,
+        peak_channel_inds_sample,
+        edge_inds_sample,
+        edge_peak_inds_sample,
+        line_scores_sample,
+    ):
+        """Helper to run matching and grouping on numpy arrays for a sample."""
+        (
+            match_edge_inds_sample,
+            match_src_peak_inds_sample,
+            match_dst_peak_inds_sample,
+            match_line_scores_sample,
+        ) = _match_candidates_sample(
+            edge_inds_sample, edge_peak_inds_sample, line_scores_sample, n_edges
+        )
+        return group_instances_sample(
+            peaks_sample,
+            peak_scores_sample,
+            peak_channel_inds_sample,
+            match_edge_inds_sample,
+            match_src_peak_inds_sample,
+            match_dst_peak_inds_sample,
+            match_line_scores_sample,
+            n_nodes,
+            sorted_edge_inds,
+            edge_types,
+            min_instance_peaks,
+            min_line_scores=min_line_scores,
+        )
+
+    def _match_and_group_instances(
+        peaks,
+        peak_scores,
+        peak_channel_inds,
+        peak_row_splits,
+        edge_inds,
+        edge_peak_inds,
+        line_scores,
+        edge_row_splits,
+    ):
+        """Helper to loop over the samples of the batch on the host."""
+        predicted_instances = [np.zeros((0, n_nodes, 2), dtype="float32")]
+        predicted_peak_scores = [np.zeros((0, n_nodes), dtype="float32")]
+        predicted_instance_scores = [np.zeros((0,), dtype="float32")]
+        n_instances = []
+        for sample in range(len(peak_row_splits) - 1):
+            peaks_start, peaks_stop = peak_row_splits[sample : sample + 2]
+            edges_start, edges_stop = edge_row_splits[sample : sample + 2]
+            (
+                predicted_instances_sample,
+                predicted_peak_scores_sample,
+                predicted_instance_scores_sample,
+            ) = _match_and_group_instances_sample(
+                peaks[peaks_start:peaks_stop],
+                peak_scores[peaks_start:peaks_stop],
+                peak_channel_inds[peaks_start:peaks_stop],
+                edge_inds[edges_start:edges_stop],
+                edge_peak_inds[edges_start:edges_stop],
+                line_scores[edges_start:edges_stop],
+            )
+            predicted_instances.append(predicted_instances_sample)
+            predicted_peak_scores.append(predicted_peak_scores_sample)
+            predicted_instance_scores.append(predicted_instance_scores_sample)
+            n_instances.append(len(predicted_instances_sample))
+
+        return (
+            np.concatenate(predicted_instances),
+            np.concatenate(predicted_peak_scores),
+            np.concatenate(predicted_instance_scores),
+            np.array(n_instances, dtype="int32"),
+        )
+
+    (
+        predicted_instances,
+        predicted_peak_scores,
+        predicted_instance_scores,
+        n_instances,
+    ) = tf.numpy_function(
+        _match_and_group_instances,
+        inp=[
+            peaks.flat_values,
+            peak_vals.flat_values,
+            peak_channel_inds.flat_values,
+            peaks.row_splits,
+            edge_inds.flat_values,
+            edge_peak_inds.flat_values,
+            line_scores.flat_values,
+            edge_inds.row_splits,
+        ],
+        Tout=[tf.float32, tf.float32, tf.float32, tf.int32],
+    )
+    predicted_instances.set_shape([None, n_nodes, 2])
+    predicted_peak_scores.set_shape([None, n_nodes])
+    predicted_instance_scores.set_shape([None])
+    n_instances.set_shape([None])
+
+    predicted_instances = tf.RaggedTensor.from_row_lengths(
+        predicted_instances, n_instances
+    )
+    predicted_peak_scores = tf.RaggedTensor.from_row_lengths(
+        predicted_peak_scores, n_instances
+    )
+    predicted_instance_scores = tf.RaggedTensor.from_row_lengths(
+        predicted_instance_scores, n_instances
+    )
+
+    return predicted_instances, predicted_peak_scores, predicted_instance_scores
+
+
 def toposort_edges(edge_types: List[EdgeType]) -> Tuple[int]:
     """Find a topological ordering for a list of edge types.
 
@@ -1340,6 +1810,9 @@ class PAFScorer:
         min_line_scores: Minimum line score (between -1 and 1) required to form a match
             between candidate point pairs. Useful for rejecting spurious detections when
             there are no better ones.
+        fp16_scores: If `True`, the dot products between the PAF vectors and the
+            displacement vectors used to score candidate connections are computed in
+            half precision. This is faster but slightly less accurate.
         edge_inds: The edges of the skeleton defined as a list of (source, destination)
             tuples of node indices. This is created automatically on initialization.
         edge_types: A list of `EdgeType` instances representing the edges of the
@@ -1382,6 +1855,7 @@ class PAFScorer:
     n_points: int = 10
     min_instance_peaks: Union[int, float] = 0
     min_line_scores: float = 0.25
+    fp16_scores: bool = False
 
     edge_inds: List[Tuple[int, int]] = attr.ib(init=False)
     edge_types: List[EdgeType] = attr.ib(init=False)
@@ -1493,6 +1967,7 @@ class PAFScorer:
             self.max_edge_length_ratio,
             self.dist_penalty_weight,
             self.n_nodes,
+            fp16_scores=self.fp16_scores,
         )
 
     def match_candidates(
@@ -1626,6 +2101,64 @@ class PAFScorer:
             min_line_scores=self.min_line_scores,
         )
 
+    def match_and_group_instances(
+        self,
+        peaks: tf.RaggedTensor,
+        peak_vals: tf.RaggedTensor,
+        peak_channel_inds: tf.RaggedTensor,
+        edge_inds: tf.RaggedTensor,
+        edge_peak_inds: tf.RaggedTensor,
+        line_scores: tf.RaggedTensor,
+    ) -> Tuple[tf.RaggedTensor, tf.RaggedTensor, tf.RaggedTensor]:
+        """Match candidate connections and group them into instances for a batch.
+
+        Args:
+            peaks: The sample-grouped detected peaks in a batch as a `tf.RaggedTensor`
+                of shape `(n_samples, (n_peaks), 2)` and dtype `tf.float32`. These
+                should be `(x, y)` coordinates of each peak in the image scale.
+            peak_vals: The sample-grouped scores of the detected peaks in a batch as a
+                `tf.RaggedTensor` of shape `(n_samples, (n_peaks))` and dtype
+                `tf.float32`.
+            peak_channel_inds: The sample-grouped indices of the channel (node) that
+                each detected peak is associated with as a `tf.RaggedTensor` of shape
+                `(n_samples, (n_peaks))` and dtype `tf.int32`.
+            edge_inds: Sample-grouped edge indices as a `tf.RaggedTensor` of shape
+                `(n_samples, (n_candidates))` and dtype `tf.int32`. Can be generated
+                using `PAFScorer.score_paf_lines()`.
+            edge_peak_inds: Sample-grouped indices of the peaks that form the source and
+                destination of each candidate connection as a `tf.RaggedTensor` of shape
+                `(n_samples, (n_candidates), 2)` and dtype `tf.int32`. Can be generated
+                using `PAFScorer.score_paf_lines()`.
+            line_scores: Sample-grouped scores for each candidate connection as a
+                `tf.RaggedTensor` of shape `(n_samples, (n_candidates))` and dtype
+                `tf.float32`. Can be generated using `PAFScorer.score_paf_lines()`.
+
+        Returns:
+            A tuple of `(predicted_instances, predicted_peak_scores,
+            predicted_instance_scores)` in the same format as
+            `PAFScorer.group_instances()`.
+
+        Notes:
+            This is a convenience wrapper for the standalone
+            `match_and_group_instances_batch()`.
+
+        See also: PAFScorer.match_candidates, PAFScorer.group_instances
+        """
+        return match_and_group_instances_batch(
+            peaks,
+            peak_vals,
+            peak_channel_inds,
+            edge_inds,
+            edge_peak_inds,
+            line_scores,
+            self.n_edges,
+            self.n_nodes,
+            self.sorted_edge_inds,
+            self.edge_types,
+            self.min_instance_peaks,
+            min_line_scores=self.min_line_scores,
+        )
+
     def predict(
         self,
         pafs: tf.Tensor,
@@ -1670,30 +2203,22 @@ class PAFScorer:
             See the `PAFScorer` class documentation for more details on the algorithm.
 
         See also:
-            PAFScorer.score_paf_lines, PAFScorer.match_candidates,
-            PAFScorer.group_instances
+            PAFScorer.score_paf_lines, PAFScorer.match_and_group_instances
         """
         edge_inds, edge_peak_inds, line_scores = self.score_paf_lines(
             pafs, peaks, peak_channel_inds
         )
-        (
-            match_edge_inds,
-            match_src_peak_inds,
-            match_dst_peak_inds,
-            match_line_scores,
-        ) = self.match_candidates(edge_inds, edge_peak_inds, line_scores)
         (
             predicted_instances,
             predicted_peak_scores,
             predicted_instance_scores,
-        ) = self.group_instances(
+        ) = self.match_and_group_instances(
             peaks,
             peak_vals,
             peak_channel_inds,
-            match_edge_inds,
-            match_src_peak_inds,
-            match_dst_peak_inds,
-            match_line_scores,
+            edge_inds,
+            edge_peak_inds,
+            line_scores,
         )
         return (
             predicted_instances,
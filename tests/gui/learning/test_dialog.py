@@ -5,9 +5,15 @@ import traceback
 
 import cattr
 import pytest
-from qtpy import QtWidgets
-
-from sleap.gui.learning.dialog import LearningDialog, TrainingEditorWidget
+from qtpy import QtCore, QtWidgets
+
+from sleap.gui.learning.dialog import (
+    PIPELINE_HEADS,
+    LabelsLoader,
+    LearningDialog,
+    TrainingEditorWidget,
+    TrainingPipelineWidget,
+)
 from sleap.gui.learning.configs import (
     TrainingConfigFilesWidget,
     ConfigFileInfo,
@@ -16,6 +22,7 @@ from sleap.gui.learning.configs import (
 from sleap.gui.learning.scopedkeydict import (
     ScopedKeyDict,
     apply_cfg_transforms_to_key_val_dict,
+    unstructure_config,
 )
 from sleap.gui.app import MainWindow
 from sleap.io.dataset import Labels
@@ -23,6 +30,15 @@ from sleap.nn.config import TrainingJobConfig, UNetConfig
 from sleap.util import get_package_file
 
 
+@pytest.fixture
+def learning_dialog(qtbot, min_labels_slp, tmpdir):
+    return LearningDialog(
+        mode="training",
+        labels_filename=str(Path(tmpdir, "labels.slp")),
+        labels=min_labels_slp,
+    )
+
+
 def test_use_hidden_params_from_loaded_config(
     qtbot, min_labels_slp, min_bottomup_model_path, tmpdir
 ):
@@ -429,3 +445,228 @@ def test_immutablilty_of_trained_config_info(
     # saving multiple configs from one config info.
     ld.save(output_dir=tmpdir)
     ld.save(output_dir=tmpdir)
+
+
+def test_tabs_built_lazily(learning_dialog):
+    ld = learning_dialog
+
+    # Only tabs for the shown pipeline have been built
+    ld.pipeline_form_widget.current_pipeline = "bottom-up"
+    assert "multi_instance" in ld.tabs
+    assert "multi_class_bottomup" not in ld.tabs
+
+    # Accessing a tab builds it
+    tab = ld.tabs["multi_class_bottomup"]
+    assert isinstance(tab, TrainingEditorWidget)
+    assert "multi_class_bottomup" in ld.tabs
+
+    with pytest.raises(KeyError):
+        ld.tabs["not_a_head"]
+
+
+def test_config_file_info_key_val_dict():
+    cfg = TrainingJobConfig()
+    cfg_info = ConfigFileInfo(config=cfg)
+
+    expected = ScopedKeyDict.from_hierarchical_dict(cattr.unstructure(cfg)).key_val_dict
+    assert cfg_info.key_val_dict == expected
+
+    # Cached data is reused, but callers get their own copy
+    key_val_dict = cfg_info.key_val_dict
+    key_val_dict["data.preprocessing.input_scaling"] = 0.1
+    assert cfg_info.key_val_dict == expected
+    assert cfg_info._key_val_dict_cache[0] is cfg
+
+
+def test_split_pipeline_data_by_head():
+    pipeline_data = {
+        "_pipeline": "top-down",
+        "data.preprocessing.input_scaling": 0.5,
+        "model.heads.centroid.anchor_part": "head",
+        "model.heads.centered_instance.anchor_part": "thorax",
+    }
+
+    shared_data, head_data = LearningDialog.split_pipeline_data_by_head(pipeline_data)
+    assert shared_data == {
+        "_pipeline": "top-down",
+        "data.preprocessing.input_scaling": 0.5,
+    }
+    assert head_data["centroid"] == {"model.heads.centroid.anchor_part": "head"}
+    assert head_data["centered_instance"] == {
+        "model.heads.centered_instance.anchor_part": "thorax"
+    }
+    assert head_data["multi_instance"] == {}
+
+
+def test_get_frame_selection_key():
+    get_key = LearningDialog.get_frame_selection_key
+    assert get_key("nothing") is None
+    assert get_key("current frame") == "frame"
+    assert get_key("random frames (20 total frames)") == "random"
+    assert get_key("random frames in current video (10 frames)") == "random_video"
+    assert get_key("suggested frames (5 total frames)") == "suggestions"
+    assert get_key("user labeled frames (3 total frames)") == "user"
+    assert get_key("selected clip (4 frames)") == "clip"
+    assert get_key("entire current video (100 frames)") == "video"
+    assert get_key("all videos (200 frames)") == "all_videos"
+
+
+def test_labels_loader(qtbot, min_labels_slp_path):
+    loader = LabelsLoader(min_labels_slp_path)
+    QtCore.QThreadPool.globalInstance().start(loader)
+    labels = loader.wait()
+    assert isinstance(labels, Labels)
+    assert len(labels.labeled_frames) > 0
+
+    loader = LabelsLoader("does_not_exist.slp")
+    QtCore.QThreadPool.globalInstance().start(loader)
+    with pytest.raises(Exception):
+        loader.wait()
+
+
+def test_count_total_frames_for_selection_option():
+    count_frames = LearningDialog.count_total_frames_for_selection_option
+    assert count_frames({}) == 0
+    assert count_frames({"a": (1, 2, 3), "b": [4, 5]}) == 5
+    assert count_frames({"a": (10, -25), "b": (0, 0), "c": [7]}) == 16
+
+
+def test_set_fields_emits_value_changed_once(qtbot):
+    ted = TrainingEditorWidget(head="centroid")
+
+    emitted = []
+    ted.valueChanged.connect(lambda: emitted.append(True))
+
+    ted.set_fields_from_key_val_dict(
+        {
+            "data.preprocessing.input_scaling": 0.25,
+            "optimization.epochs": 7,
+            "optimization.batch_size": 3,
+            "model.backbone.unet.filters": 8,
+        }
+    )
+    assert len(emitted) == 1
+
+    form_data = ted.get_all_form_data()
+    assert form_data["data.preprocessing.input_scaling"] == 0.25
+    assert form_data["optimization.epochs"] == 7
+    assert form_data["_backbone_name"] == "unet"
+
+    # Setting the same values again doesn't change anything, so nothing is emitted
+    ted.set_fields_from_key_val_dict(
+        {"optimization.epochs": 7, "optimization.batch_size": 3}
+    )
+    assert len(emitted) == 1
+
+
+def test_scoped_key_dict_from_hierarchical_dict():
+    hierarch_dict = {
+        "a": 1,
+        "b": {"c": 2, "d": {"e": 3, "f": {}}, "g": 4},
+        "h": {"i": None},
+        "j": 5,
+    }
+    key_val_dict = ScopedKeyDict.from_hierarchical_dict(hierarch_dict).key_val_dict
+
+    # Keys are in the same (depth-first) order as the hierarchical dict
+    assert list(key_val_dict.items()) == [
+        ("a", 1),
+        ("b.c", 2),
+        ("b.d.e", 3),
+        ("b.g", 4),
+        ("h.i", None),
+        ("j", 5),
+    ]
+
+
+def test_unstructure_config():
+    cfg = TrainingJobConfig()
+    assert unstructure_config(cfg) == cattr.unstructure(cfg)
+
+    cfg.model.backbone.unet = UNetConfig(max_stride=32)
+    cfg.data.labels.skeletons = []
+    cfg_dict = unstructure_config(cfg)
+    assert cfg_dict == cattr.unstructure(cfg)
+    assert cfg_dict["model"]["backbone"]["unet"]["max_stride"] == 32
+
+
+def test_training_pipeline_widget_current_pipeline(qtbot):
+    widget = TrainingPipelineWidget(mode="training")
+
+    for pipeline in ("top-down", "bottom-up", "single", "top-down-id", "bottom-up-id"):
+        widget.current_pipeline = pipeline
+        assert widget.current_pipeline == pipeline
+
+    assert widget.pipeline_field.value() == "multi-animal bottom-up-id"
+
+    with pytest.raises(ValueError):
+        widget.current_pipeline = "foo"
+
+
+def test_update_tabs_from_pipeline(qtbot, learning_dialog):
+    ld = learning_dialog
+    ld.pipeline_form_widget.current_pipeline = "top-down"
+
+    updated_data = dict()
+    assert not ld.adjust_data_to_update_other_tabs({"_pipeline": "x"}, updated_data)
+    assert updated_data == dict()
+
+    assert ld.adjust_data_to_update_other_tabs(
+        {"model.heads.centroid.anchor_part": "A"}, updated_data
+    )
+    assert updated_data["data.instance_cropping.center_on_part"] == "A"
+
+    # Data which isn't part of the training config doesn't update the tabs
+    with qtbot.assertNotEmitted(ld.tabs["centroid"].valueChanged):
+        ld.update_tabs_from_pipeline({"tracking.tracker": "simple"})
+
+    with qtbot.waitSignal(ld.tabs["centroid"].valueChanged, timeout=1000):
+        ld.update_tabs_from_pipeline({"optimization.batch_size": 2})
+
+    # Tabs aren't updated again if the training config data hasn't changed
+    calls = []
+    ld.tabs["centroid"].set_fields_from_key_val_dict = calls.append
+    ld.update_tabs_from_pipeline({"optimization.batch_size": 2})
+    assert calls == []
+
+    ld.update_tabs_from_pipeline({"optimization.batch_size": 3})
+    assert calls == [{"optimization.batch_size": 3}]
+
+
+def test_frame_selection_options(min_labels_slp, learning_dialog):
+    ld = learning_dialog
+    video = min_labels_slp.video
+    ld.frame_selection = {
+        "random": {video: [1, 2, 3]},
+        "user": {video: [0]},
+        "video": {video: (0, -10)},
+    }
+
+    options = ld.pipeline_form_widget.fields["_predict_frames"].options_list
+    assert "random frames (3 total frames)" in options
+    assert "user labeled frames (1 total frames)" in options
+    assert "entire current video (10 frames)" in options
+    assert not any(option.startswith("suggested") for option in options)
+
+
+def test_set_pipeline_tabs(learning_dialog):
+    ld = learning_dialog
+
+    for pipeline, heads in PIPELINE_HEADS.items():
+        ld.pipeline_form_widget.current_pipeline = pipeline
+        assert ld.shown_tab_names == list(heads)
+        assert ld.tab_widget.count() == len(heads) + 1
+
+
+def test_new_tab_gets_pipeline_form_data(learning_dialog):
+    ld = learning_dialog
+    ld.pipeline_form_widget.current_pipeline = "top-down"
+    ld.pipeline_form_widget.set_form_data({"outputs.run_name_prefix": "foo_"})
+
+    # Switching pipeline builds the tab for a head which hasn't been shown yet
+    assert "multi_instance" not in ld.tabs
+    ld.pipeline_form_widget.current_pipeline = "bottom-up"
+    assert "multi_instance" in ld.tabs
+
+    tab_data = ld.tabs["multi_instance"].get_all_form_data()
+    assert tab_data["outputs.run_name_prefix"] == "foo_"
@@ -132,3 +132,16 @@ def test_string_list_widget(qtbot):
 
     widget.setValue(["zip", "cab"])
     assert widget.text() == "zip cab"
+
+
+def test_load_form_yaml_cache(tmpdir):
+    yaml_path = str(tmpdir.join("form.yaml"))
+    with open(yaml_path, "w") as f:
+        f.write("main:\n  - name: foo\n    type: int\n    default: 1\n")
+
+    items = formbuilder.load_form_yaml(yaml_path)
+    assert items["main"][0]["default"] == 1
+
+    # Returned data is a copy, so modifying it doesn't affect the cache.
+    items["main"][0]["default"] = 2
+    assert formbuilder.load_form_yaml(yaml_path)["main"][0]["default"] == 1
@@ -15,11 +15,15 @@ from sleap.nn.paf_grouping import (
     match_candidates_batch,
     group_instances_sample,
     group_instances_batch,
+    match_and_group_instances_batch,
     EdgeType,
     EdgeConnection,
     PeakID,
     toposort_edges,
     assign_connections_to_instances,
+    make_predicted_instances,
+    pack_peak_key,
+    unpack_peak_key,
 )
 
 sleap.nn.system.use_cpu_only()
@@ -41,6 +45,19 @@ def test_get_connection_candidates():
     )
 
 
+def test_get_connection_candidates_unsorted_peaks():
+    peak_channel_inds_sample = tf.constant([1, 0, 2, 0, 1], tf.int32)
+    skeleton_edges = tf.constant([[0, 1], [3, 2], [1, 2]], tf.int32)
+    n_nodes = 4
+
+    edge_inds, edge_peak_inds = get_connection_candidates(
+        peak_channel_inds_sample, skeleton_edges, n_nodes
+    )
+
+    assert_array_equal(edge_inds, [0, 0, 0, 0, 2, 2])
+    assert_array_equal(edge_peak_inds, [[1, 0], [1, 4], [3, 0], [3, 4], [0, 2], [4, 2]])
+
+
 def test_make_line_subs():
     peaks_sample = tf.constant([[0, 0], [4, 8]], tf.float32)
     edge_peak_inds = tf.constant([[0, 1]], tf.int32)
@@ -89,6 +106,12 @@ def test_score_paf_lines():
     scores = score_paf_lines(paf_lines, peaks_sample, edge_peak_inds, max_edge_length=2)
     assert_allclose(scores, [24.27], atol=1e-2)
 
+    scores = score_paf_lines(
+        paf_lines, peaks_sample, edge_peak_inds, max_edge_length=2, fp16_scores=True
+    )
+    assert scores.dtype == tf.float32
+    assert_allclose(scores, [24.27], atol=1e-1)
+
 
 def test_compute_distance_penalty():
     penalties = compute_distance_penalty(
@@ -155,6 +178,100 @@ def test_match_candidates_sample():
     assert tf.gather(dst_peak_inds_k, match_dst_peak_inds)[0] == 1
 
 
+def test_match_candidates_sample_single_peak():
+    # A single source peak is matched to the best destination without NaN scores.
+    (
+        match_edge_inds,
+        match_src_peak_inds,
+        match_dst_peak_inds,
+        match_line_scores,
+    ) = match_candidates_sample(
+        tf.constant([0, 0, 0, 1, 1], tf.int32),
+        tf.constant([[0, 1], [0, 2], [0, 3], [1, 4], [1, 5]], tf.int32),
+        tf.constant([0.5, np.nan, 0.8, np.nan, np.nan], tf.float32),
+        n_edges=2,
+    )
+
+    assert_array_equal(match_edge_inds, [0])
+    assert_array_equal(match_src_peak_inds, [0])
+    assert_array_equal(match_dst_peak_inds, [2])
+    assert_allclose(match_line_scores, [0.8])
+
+
+def test_match_candidates_sample_sparse():
+    # Most candidates are infeasible (NaN scores), so this is matched sparsely.
+    n_peaks = 9
+    src_inds, dst_inds = np.meshgrid(
+        np.arange(n_peaks), np.arange(n_peaks, 2 * n_peaks), indexing="ij"
+    )
+    edge_peak_inds_sample = np.stack([src_inds.ravel(), dst_inds.ravel()], axis=1)
+    line_scores_sample = np.full((n_peaks, n_peaks), np.nan, dtype="float32")
+    line_scores_sample[np.arange(n_peaks), np.arange(n_peaks)[::-1]] = 1.0
+    line_scores_sample[0, 0] = 0.5
+
+    (
+        match_edge_inds,
+        match_src_peak_inds,
+        match_dst_peak_inds,
+        match_line_scores,
+    ) = match_candidates_sample(
+        tf.zeros([n_peaks * n_peaks], tf.int32),
+        tf.cast(edge_peak_inds_sample, tf.int32),
+        tf.constant(line_scores_sample.ravel()),
+        n_edges=1,
+    )
+
+    assert_array_equal(match_edge_inds, np.zeros(n_peaks))
+    assert_array_equal(match_src_peak_inds, np.arange(n_peaks))
+    assert_array_equal(match_dst_peak_inds, np.arange(n_peaks)[::-1])
+    assert_array_equal(match_line_scores, np.ones(n_peaks))
+
+
+def test_match_candidates_sample_sparse_infeasible():
+    # Only the first destination peak has any feasible candidates, so there is no
+    # full matching and only the best of those candidates is matched.
+    n_peaks = 9
+    src_inds, dst_inds = np.meshgrid(
+        np.arange(n_peaks), np.arange(n_peaks, 2 * n_peaks), indexing="ij"
+    )
+    edge_peak_inds_sample = np.stack([src_inds.ravel(), dst_inds.ravel()], axis=1)
+    line_scores_sample = np.full((n_peaks, n_peaks), np.nan, dtype="float32")
+    line_scores_sample[:, 0] = 0.5
+    line_scores_sample[3, 0] = 0.9
+
+    (
+        match_edge_inds,
+        match_src_peak_inds,
+        match_dst_peak_inds,
+        match_line_scores,
+    ) = match_candidates_sample(
+        tf.zeros([n_peaks * n_peaks], tf.int32),
+        tf.cast(edge_peak_inds_sample, tf.int32),
+        tf.constant(line_scores_sample.ravel()),
+        n_edges=1,
+    )
+
+    assert_array_equal(match_edge_inds, [0])
+    assert_array_equal(match_src_peak_inds, [3])
+    assert_array_equal(match_dst_peak_inds, [0])
+    assert_allclose(match_line_scores, [0.9])
+
+    # No feasible candidates at all.
+    (
+        match_edge_inds,
+        match_src_peak_inds,
+        match_dst_peak_inds,
+        match_line_scores,
+    ) = match_candidates_sample(
+        tf.zeros([n_peaks * n_peaks], tf.int32),
+        tf.cast(edge_peak_inds_sample, tf.int32),
+        tf.fill([n_peaks * n_peaks], np.nan),
+        n_edges=1,
+    )
+    assert len(match_edge_inds) == 0
+    assert len(match_line_scores) == 0
+
+
 def test_match_candidates_batch():
     row_ids = tf.constant([0, 0], dtype=tf.int32)
     edge_inds = tf.RaggedTensor.from_value_rowids(
@@ -299,6 +416,61 @@ def test_group_instances_batch():
     assert_array_equal(predicted_instance_scores.flat_values, [2.0, 1.0])
 
 
+def test_match_and_group_instances_batch():
+    row_ids = tf.zeros([5], dtype=tf.int32)
+    peaks = tf.RaggedTensor.from_value_rowids(
+        tf.reshape(tf.range(5 * 2, dtype=tf.float32), [5, 2]), row_ids
+    )
+    peak_scores = tf.RaggedTensor.from_value_rowids(
+        tf.range(5, dtype=tf.float32), row_ids
+    )
+    peak_channel_inds = tf.RaggedTensor.from_value_rowids(
+        tf.constant([0, 1, 2, 0, 1], tf.int32), row_ids
+    )
+    row_ids_candidates = tf.zeros([6], dtype=tf.int32)
+    edge_inds = tf.RaggedTensor.from_value_rowids(
+        tf.constant([0, 0, 0, 0, 1, 1], tf.int32), row_ids_candidates
+    )
+    edge_peak_inds = tf.RaggedTensor.from_value_rowids(
+        tf.constant([[0, 1], [0, 4], [3, 1], [3, 4], [1, 2], [4, 2]], tf.int32),
+        row_ids_candidates,
+    )
+    line_scores = tf.RaggedTensor.from_value_rowids(
+        tf.constant([1.0, 0.0, 0.0, 1.0, 1.0, 0.0], tf.float32), row_ids_candidates
+    )
+
+    (
+        predicted_instances,
+        predicted_peak_scores,
+        predicted_instance_scores,
+    ) = match_and_group_instances_batch(
+        peaks,
+        peak_scores,
+        peak_channel_inds,
+        edge_inds,
+        edge_peak_inds,
+        line_scores,
+        n_edges=2,
+        n_nodes=3,
+        sorted_edge_inds=(0, 1),
+        edge_types=[EdgeType(0, 1), EdgeType(1, 2)],
+        min_instance_peaks=0,
+    )
+
+    assert isinstance(predicted_instances, tf.RaggedTensor)
+    assert_array_equal(
+        predicted_instances.flat_values,
+        [
+            [[0.0, 1.0], [2.0, 3.0], [4.0, 5.0]],
+            [[6.0, 7.0], [8.0, 9.0], [np.nan, np.nan]],
+        ],
+    )
+    assert_array_equal(
+        predicted_peak_scores.flat_values, [[0.0, 1.0, 2.0], [3.0, 4.0, np.nan]]
+    )
+    assert_array_equal(predicted_instance_scores.flat_values, [2.0, 1.0])
+
+
 def test_toposort_edges():
     edge_inds = [
         (5, 7),
@@ -401,3 +573,75 @@ def test_assign_connections_to_instances():
         n_nodes=15,
     )
     assert all(x == 0 for x in instance_assignments.values())
+
+
+def test_assign_connections_to_instances_merge():
+    # Disconnected instances are merged when they don't share any nodes.
+    connections = {
+        EdgeType(0, 1): [EdgeConnection(0, 0, 1.0)],
+        EdgeType(2, 3): [EdgeConnection(0, 0, 1.0)],
+        EdgeType(1, 2): [EdgeConnection(0, 0, 1.0)],
+    }
+    instance_assignments = assign_connections_to_instances(connections)
+    assert instance_assignments == {
+        PeakID(0, 0): 0,
+        PeakID(1, 0): 0,
+        PeakID(2, 0): 0,
+        PeakID(3, 0): 0,
+    }
+
+    # Only the destination peak is moved when the instances share a node.
+    connections = {
+        EdgeType(0, 1): [EdgeConnection(0, 0, 1.0)],
+        EdgeType(0, 2): [EdgeConnection(1, 0, 1.0)],
+        EdgeType(1, 2): [EdgeConnection(0, 0, 1.0)],
+    }
+    instance_assignments = assign_connections_to_instances(connections)
+    assert instance_assignments == {
+        PeakID(0, 0): 0,
+        PeakID(1, 0): 0,
+        PeakID(0, 1): 1,
+        PeakID(2, 0): 0,
+    }
+
+
+def test_make_predicted_instances():
+    peaks = [
+        np.array([[0.0, 1.0], [2.0, 3.0]], dtype="float32"),
+        np.array([[4.0, 5.0]], dtype="float32"),
+        np.zeros((0, 2), dtype="float32"),
+    ]
+    peak_scores = [
+        np.array([0.5, 0.6], dtype="float32"),
+        np.array([0.7], dtype="float32"),
+        np.zeros((0,), dtype="float32"),
+    ]
+    connections = {EdgeType(0, 1): [EdgeConnection(1, 0, 0.9)]}
+    instance_assignments = {PeakID(0, 1): 3, PeakID(1, 0): 3, PeakID(0, 0): 5}
+
+    (
+        predicted_instances,
+        predicted_peak_scores,
+        predicted_instance_scores,
+    ) = make_predicted_instances(peaks, peak_scores, connections, instance_assignments)
+
+    assert_array_equal(
+        predicted_instances,
+        [
+            [[2, 3], [4, 5], [np.nan, np.nan]],
+            [[0, 1], [np.nan, np.nan], [np.nan, np.nan]],
+        ],
+    )
+    assert_allclose(predicted_peak_scores, [[0.6, 0.7, np.nan], [0.5, np.nan, np.nan]])
+    assert_allclose(predicted_instance_scores, [0.9, 0.0])
+
+    # No assigned peaks.
+    predicted_instances, _, _ = make_predicted_instances(peaks, peak_scores, {}, {})
+    assert predicted_instances.shape == (0, 3, 2)
+
+
+def test_pack_peak_key():
+    assert pack_peak_key(0, 0) == 0
+    assert pack_peak_key(2, 3) != pack_peak_key(3, 2)
+    assert unpack_peak_key(pack_peak_key(2, 3)) == PeakID(node_ind=2, peak_ind=3)
+    assert unpack_peak_key(pack_peak_key(np.int32(7), np.int64(1))) == PeakID(7, 1)